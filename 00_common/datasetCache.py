@@ -0,0 +1,212 @@
+"""binary cache of parsed csv-datasets: the csv-file is parsed once, later runs memory-map
+one .npy-file per column with the dtypes (bool, numbers, categories) already in place;
+every other column (e.g. text) is stored as the codes of its categories
+
+the cache is stored in a directory next to the dataset and is rebuilt, when the size and
+modification-time of the dataset or the options of the parser change and the sha256-hash of
+the dataset doesn't match any more
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# version of the layout of the cache, older caches are rebuilt
+I_CACHE_VERSION = 2
+# name of the file with the description of the cache
+S_META_FILE = "meta.json"
+# kinds of numpy-dtypes, which are stored as they are: bool, integers, floats, complex,
+# timedeltas and datetimes
+S_PLAIN_KINDS = "biufcmM"
+
+def df_load_cached(pth_data: Path, pth_cache_dir: Path | None = None, **kwargs) -> pd.DataFrame:
+    """load a csv-dataset from its binary cache, or parse it and create the cache
+
+    Args:
+        pth_data (Path): path of the csv-dataset
+        pth_cache_dir (Path | None, optional): directory of the caches. Defaults to None for
+        ".cache" next to the dataset.
+        **kwargs: options of `pd.read_csv`, they have to be json-serializable
+
+    Returns:
+        pd.DataFrame: the dataset, the bool- and number-columns are backed by read-only
+        memory-maps, the categories are decoded into memory
+    """
+    pth_data = Path(pth_data)
+    pth_cache = pth_cache_path(pth_data, pth_cache_dir)
+
+    # the options are part of the key, e.g. other column-names are another dataset
+    s_options = json.dumps(kwargs, sort_keys=True, default=list)
+
+    dct_meta = dct_valid_meta(pth_data, pth_cache, s_options)
+
+    if dct_meta is None:
+        df_data = pd.read_csv(pth_data, **kwargs)
+
+        dct_meta = write_cache(df_data, pth_data, pth_cache, s_options)
+
+    return df_read_cache(pth_cache, dct_meta)
+
+def pth_cache_path(pth_data: Path, pth_cache_dir: Path | None = None) -> Path:
+    """directory of the cache of a dataset
+
+    Args:
+        pth_data (Path): path of the csv-dataset
+        pth_cache_dir (Path | None, optional): directory of the caches. Defaults to None for
+        ".cache" next to the dataset.
+
+    Returns:
+        Path: directory with the .npy-files of the columns
+    """
+    if pth_cache_dir is None:
+        pth_cache_dir = pth_data.parent / ".cache"
+
+    return pth_cache_dir / pth_data.name
+
+def s_hash_file(pth_file: Path) -> str:
+    """sha256-hash of a file
+
+    Args:
+        pth_file (Path): path of the file
+
+    Returns:
+        str: hash as hex-string
+    """
+    hash_file = hashlib.sha256()
+
+    with open(pth_file, "rb") as file:
+        for bb in iter(lambda: file.read(1 << 20), b""):
+            hash_file.update(bb)
+
+    return hash_file.hexdigest()
+
+def dct_valid_meta(pth_data: Path, pth_cache: Path, s_options: str) -> dict | None:
+    """check, if the cache of a dataset is up to date
+
+    the hash of the dataset is only calculated, if its size or modification-time changed,
+    e.g. after a checkout; if it still matches, the new time is stored
+
+    Args:
+        pth_data (Path): path of the csv-dataset
+        pth_cache (Path): directory of the cache
+        s_options (str): options of the parser as json
+
+    Returns:
+        dict | None: description of the cache, None if it has to be rebuilt
+    """
+    try:
+        with open(pth_cache / S_META_FILE, encoding="utf-8") as file:
+            dct_meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if dct_meta.get("version") != I_CACHE_VERSION or dct_meta.get("options") != s_options:
+        return None
+
+    stat_data = pth_data.stat()
+
+    if dct_meta["size"] == stat_data.st_size and dct_meta["mtime_ns"] == stat_data.st_mtime_ns:
+        return dct_meta
+
+    if dct_meta["size"] != stat_data.st_size or dct_meta["sha256"] != s_hash_file(pth_data):
+        return None
+
+    dct_meta["mtime_ns"] = stat_data.st_mtime_ns
+    write_meta(pth_cache, dct_meta)
+
+    return dct_meta
+
+def write_meta(pth_cache: Path, dct_meta: dict):
+    """write the description of a cache, replacing the old one at once
+
+    Args:
+        pth_cache (Path): directory of the cache
+        dct_meta (dict): description of the cache
+    """
+    pth_tmp = pth_cache / (S_META_FILE + ".tmp")
+
+    with open(pth_tmp, "w", encoding="utf-8") as file:
+        json.dump(dct_meta, file, indent=4)
+
+    os.replace(pth_tmp, pth_cache / S_META_FILE)
+
+def write_cache(df_data: pd.DataFrame, pth_data: Path, pth_cache: Path, s_options: str) -> dict:
+    """store every column of a parsed dataset as .npy-file
+
+    columns, which aren't plain numpy-arrays of bools, numbers or dates (e.g. text, also with
+    the str-dtype of newer pandas, or nullable columns) are stored as codes of their
+    categories, so every .npy-file can be memory-mapped; the categories are part of the
+    description of the cache
+
+    Args:
+        df_data (pd.DataFrame): parsed dataset
+        pth_data (Path): path of the csv-dataset
+        pth_cache (Path): directory of the cache
+        s_options (str): options of the parser as json
+
+    Returns:
+        dict: description of the cache
+    """
+    # the old description is removed first, so an interrupted write is never used
+    shutil.rmtree(pth_cache, ignore_errors=True)
+    pth_cache.mkdir(parents=True)
+
+    stat_data = pth_data.stat()
+
+    dct_meta = {
+        "version": I_CACHE_VERSION,
+        "options": s_options,
+        "size": stat_data.st_size,
+        "mtime_ns": stat_data.st_mtime_ns,
+        "sha256": s_hash_file(pth_data),
+        "columns": []
+    }
+
+    for ii, cc in enumerate(df_data.columns):
+        sr_column = df_data[cc]
+        dct_column = {"name": cc, "file": f"{ii}.npy"}
+
+        if isinstance(sr_column.dtype, np.dtype) and sr_column.dtype.kind in S_PLAIN_KINDS:
+            np_column = sr_column.to_numpy()
+        else:
+            cat_column = pd.Categorical(sr_column)
+
+            dct_column["categories"] = cat_column.categories.tolist()
+            np_column = cat_column.codes
+
+        np.save(pth_cache / dct_column["file"], np.ascontiguousarray(np_column))
+
+        dct_meta["columns"].append(dct_column)
+
+    write_meta(pth_cache, dct_meta)
+
+    return dct_meta
+
+def df_read_cache(pth_cache: Path, dct_meta: dict) -> pd.DataFrame:
+    """memory-map the columns of a cache
+
+    Args:
+        pth_cache (Path): directory of the cache
+        dct_meta (dict): description of the cache
+
+    Returns:
+        pd.DataFrame: the dataset
+    """
+    dct_columns = {}
+
+    for dd in dct_meta["columns"]:
+        np_column = np.load(pth_cache / dd["file"], mmap_mode="r")
+
+        if "categories" in dd:
+            # the codes are copied, pandas doesn't keep them in the memory-map
+            dct_columns[dd["name"]] = pd.Categorical.from_codes(np_column, dd["categories"])
+        else:
+            dct_columns[dd["name"]] = np_column
+
+    # without copy=False pandas consolidates the columns of the same dtype into a single
+    # in-memory block, with it every column keeps its memory-map
+    return pd.DataFrame(dct_columns, copy=False)
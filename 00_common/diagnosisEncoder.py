@@ -0,0 +1,182 @@
+"""compact integer-encoding of the acute-inflammation (diagnosis) dataset,
+shared by the bayes-classificators
+"""
+import numpy as np
+import pandas as pd
+
+# code of missing values and of values which aren't in the codebook
+I_MISSING = 255
+
+class DiagnosisEncoder:
+    """encodes the columns of the diagnosis-dataset into uint8-codes: the temperature by its bin,
+    every other column (the symptoms and diseases) by a codebook of its values
+    """
+    # name of the temperature-column
+    s_temperature_column: str
+    # bounds of the temperature-bins, the lowest bound is included in the first bin
+    tpl_f_temp_bounds: tuple[float, ...]
+    # names of the encoded columns in the order of the code-columns
+    lst_s_columns: list[str]
+    # values of every column in the order of their codes, the labels of the bins for the temperature
+    dct_tpl_codebooks: dict[str, tuple]
+
+    def __init__(self, s_temperature_column: str, tpl_f_temp_bounds: tuple[float, ...], tpl_temp_labels=None):
+        """initializing function
+
+        Args:
+            s_temperature_column (str): name of the temperature-column
+            tpl_f_temp_bounds (tuple[float, ...]): ascending bounds of the temperature-bins
+            tpl_temp_labels (tuple, optional): label of every bin. Defaults to None for the
+            numbers of the bins.
+
+        Raises:
+            ValueError: if the bounds aren't ascending or the number of labels doesn't match
+        """
+        if np.any(np.diff(tpl_f_temp_bounds) <= 0):
+            raise ValueError(f"the temperature-bounds must be ascending, not {tpl_f_temp_bounds}")
+
+        if tpl_temp_labels is None:
+            tpl_temp_labels = tuple(range(len(tpl_f_temp_bounds) - 1))
+
+        if len(tpl_temp_labels) != len(tpl_f_temp_bounds) - 1:
+            raise ValueError(
+                f"{len(tpl_f_temp_bounds) - 1} temperature-bins need as many labels, "
+                f"not {len(tpl_temp_labels)}"
+            )
+
+        self.s_temperature_column = s_temperature_column
+        self.tpl_f_temp_bounds = tuple(tpl_f_temp_bounds)
+
+        self.lst_s_columns = []
+        self.dct_tpl_codebooks = {s_temperature_column: tuple(tpl_temp_labels)}
+
+    def fit(self, df_data: pd.DataFrame) -> "DiagnosisEncoder":
+        """create the codebooks of all the columns
+
+        Args:
+            df_data (pd.DataFrame): dataset with the raw temperature
+
+        Raises:
+            ValueError: if a column has too many values for an uint8-code
+
+        Returns:
+            DiagnosisEncoder: the encoder itself
+        """
+        self.lst_s_columns = list(df_data.columns)
+
+        for cc in self.lst_s_columns:
+            if cc == self.s_temperature_column:
+                continue
+
+            # sorted, so the codes don't depend on the order of the rows (False = 0, True = 1)
+            tpl_values = tuple(sorted(df_data[cc].dropna().unique().tolist()))
+
+            if len(tpl_values) >= I_MISSING:
+                raise ValueError(f"the column {cc!r} has too many values ({len(tpl_values)})")
+
+            self.dct_tpl_codebooks[cc] = tpl_values
+
+        return self
+
+    def transform(self, df_data: pd.DataFrame) -> np.ndarray:
+        """encode a dataset
+
+        Args:
+            df_data (pd.DataFrame): dataset with the raw temperature and the columns of `fit`
+
+        Returns:
+            np.ndarray: uint8-codes with one row per row and one column per column of `fit`,
+            every column is contiguous, `I_MISSING` for missing and unknown values
+        """
+        np_codes = np.empty((len(df_data), len(self.lst_s_columns)), dtype=np.uint8, order="F")
+
+        for jj, cc in enumerate(self.lst_s_columns):
+            np_codes[:, jj] = self.np_encode_column(df_data[cc], cc)
+
+        return np_codes
+
+    def fit_transform(self, df_data: pd.DataFrame) -> np.ndarray:
+        """create the codebooks and encode the dataset
+
+        Args:
+            df_data (pd.DataFrame): dataset with the raw temperature
+
+        Returns:
+            np.ndarray: uint8-codes like `transform`
+        """
+        return self.fit(df_data).transform(df_data)
+
+    def np_encode_column(self, sr_data: pd.Series, s_column: str) -> np.ndarray:
+        """encode the values of a single column
+
+        Args:
+            sr_data (pd.Series): values of the column
+            s_column (str): name of the column
+
+        Returns:
+            np.ndarray: uint8-code of every value
+        """
+        if s_column == self.s_temperature_column:
+            return self.np_bin_temperature(sr_data.to_numpy(dtype=np.float64))
+
+        np_codes = pd.Categorical(sr_data, categories=self.dct_tpl_codebooks[s_column]).codes
+
+        return np.where(np_codes < 0, I_MISSING, np_codes).astype(np.uint8)
+
+    def np_bin_temperature(self, np_temperature: np.ndarray) -> np.ndarray:
+        """find the bin of every temperature, like `pd.cut` with `include_lowest=True`
+
+        Args:
+            np_temperature (np.ndarray): temperatures
+
+        Returns:
+            np.ndarray: uint8-code of the bin of every temperature, `I_MISSING` outside of the bins
+        """
+        np_bounds = np.asarray(self.tpl_f_temp_bounds)
+
+        # the bins include their upper bound
+        np_bins = np.searchsorted(np_bounds, np_temperature, side="left") - 1
+        np_bins[np_temperature == np_bounds[0]] = 0
+
+        np_valid = (np_bins >= 0) & (np_bins < len(np_bounds) - 1)
+
+        return np.where(np_valid, np_bins, I_MISSING).astype(np.uint8)
+
+    def np_category_counts(self, lst_s_columns: list[str] | None = None) -> np.ndarray:
+        """number of codes of every column
+
+        Args:
+            lst_s_columns (list[str] | None, optional): names of the columns. Defaults to None
+            for all the columns.
+
+        Returns:
+            np.ndarray: length of the codebook of every column
+        """
+        return np.array([
+            len(self.dct_tpl_codebooks[cc]) for cc in (lst_s_columns or self.lst_s_columns)
+        ], dtype=np.intp)
+
+    def np_column_indices(self, lst_s_columns: list[str]) -> np.ndarray:
+        """position of columns in the codes
+
+        Args:
+            lst_s_columns (list[str]): names of the columns
+
+        Returns:
+            np.ndarray: index of every column in the code-columns
+        """
+        return np.array([self.lst_s_columns.index(cc) for cc in lst_s_columns], dtype=np.intp)
+
+    def np_decode(self, np_codes: np.ndarray, s_column: str) -> np.ndarray:
+        """convert the codes of a column back into its values
+
+        Args:
+            np_codes (np.ndarray): codes of the column
+            s_column (str): name of the column
+
+        Returns:
+            np.ndarray: value of every code, None for `I_MISSING`
+        """
+        np_values = np.array(self.dct_tpl_codebooks[s_column] + (None,), dtype=object)
+
+        return np_values[np.minimum(np_codes, len(np_values) - 1)]
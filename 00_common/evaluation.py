@@ -0,0 +1,203 @@
+"""seeded splits and cross-validation of the classificators, shared by the homeworks
+
+the splits are precomputed as arrays of row-positions, so every fold and every value of a
+hyperparameter-grid is evaluated on exactly the same rows; a fold is evaluated for the whole
+grid (or a chunk of it) at once, so the classificators can reuse their count-tables or
+distance-matrices for all the hyperparameters:
+
+    lst_tpl_folds = lst_tpl_np_kfold(len(df_data), 5, i_seed=0)
+    df_scores = df_cross_validate(fn_scores, lst_tpl_folds, lst_dct_grid({"alpha": [0.5, 1]}))
+    print(df_summary(df_scores))
+
+`fn_scores(np_train, np_test, lst_dct_params)` returns the score of every parameter-set,
+it has to be picklable (a module-level function or a `functools.partial` of one) for the
+worker-processes
+"""
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+
+import numpy as np
+import pandas as pd
+
+def df_training_test_split(
+        df_data: pd.DataFrame,
+        f_split: float,
+        i_seed: int | None = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a dataframe into a training- and test-dataframe
+
+    Args:
+        df_data (pd.DataFrame): complete dataframe
+        f_split (float): fraction of the training-dataframe
+        i_seed (int | None, optional): seed of the split. Defaults to None for the global
+        random state of numpy.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: training-dataframe, test-dataframe
+    """
+    # randomly select the training-data
+    df_training = df_data.sample(frac=f_split, random_state=i_seed)
+    # use the remaining data as the test-data
+    df_test = df_data.drop(df_training.index)
+
+    return df_training, df_test
+
+def np_fold_ids(i_rows: int, i_folds: int, i_seed: int | None = None) -> np.ndarray:
+    """assign every row randomly to one of the folds, the folds differ by at most one row
+
+    Args:
+        i_rows (int): number of rows
+        i_folds (int): number of folds
+        i_seed (int | None, optional): seed of the assignment. Defaults to None.
+
+    Raises:
+        ValueError: if there are less than 2 folds or more folds than rows
+
+    Returns:
+        np.ndarray: fold of every row
+    """
+    if not 2 <= i_folds <= i_rows:
+        raise ValueError(f"{i_rows} rows can't be split into {i_folds} folds")
+
+    return np.random.default_rng(i_seed).permutation(np.arange(i_rows) % i_folds)
+
+def lst_tpl_np_kfold(i_rows: int, i_folds: int, i_seed: int | None = None) -> list[tuple[np.ndarray, np.ndarray]]:
+    """k-fold split: every row is tested exactly once
+
+    Args:
+        i_rows (int): number of rows
+        i_folds (int): number of folds
+        i_seed (int | None, optional): seed of the split. Defaults to None.
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray]]: sorted positions of the training- and test-rows
+        of every fold
+    """
+    np_ids = np_fold_ids(i_rows, i_folds, i_seed)
+
+    return [(np.flatnonzero(np_ids != ii), np.flatnonzero(np_ids == ii)) for ii in range(i_folds)]
+
+def lst_tpl_np_repeated_splits(
+        i_rows: int,
+        f_split: float,
+        i_repeats: int,
+        i_seed: int | None = None
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+    """independent random training- and test-splits, like `df_training_test_split` repeated
+
+    Args:
+        i_rows (int): number of rows
+        f_split (float): fraction of the training-rows
+        i_repeats (int): number of splits
+        i_seed (int | None, optional): seed of the splits. Defaults to None.
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray]]: sorted positions of the training- and test-rows
+        of every split
+    """
+    rng = np.random.default_rng(i_seed)
+    i_training = round(i_rows * f_split)
+
+    lst_tpl_splits = []
+
+    for _ in range(i_repeats):
+        np_permutation = rng.permutation(i_rows)
+
+        lst_tpl_splits.append((np.sort(np_permutation[:i_training]), np.sort(np_permutation[i_training:])))
+
+    return lst_tpl_splits
+
+def lst_dct_grid(dct_lst_values: dict[str, list]) -> list[dict]:
+    """all the combinations of the values of the hyperparameters
+
+    Args:
+        dct_lst_values (dict[str, list]): values of every hyperparameter
+
+    Returns:
+        list[dict]: parameter-sets, the last hyperparameter changes fastest
+    """
+    return [
+        dict(zip(dct_lst_values, tpl_values))
+        for tpl_values in itertools.product(*dct_lst_values.values())
+    ]
+
+def df_cross_validate(
+        fn_scores,
+        lst_tpl_folds: list[tuple[np.ndarray, np.ndarray]],
+        lst_dct_params: list[dict],
+        i_workers: int | None = 1,
+        i_grid_chunks: int = 1
+    ) -> pd.DataFrame:
+    """evaluate every parameter-set on every fold
+
+    Args:
+        fn_scores (callable): `fn_scores(np_train, np_test, lst_dct_params)` returns the score
+        of every parameter-set for a fold
+        lst_tpl_folds (list[tuple[np.ndarray, np.ndarray]]): positions of the training- and
+        test-rows of every fold
+        lst_dct_params (list[dict]): parameter-sets, e.g. of `lst_dct_grid`
+        i_workers (int | None, optional): number of worker-processes, None for one per cpu,
+        1 to evaluate in this process. Defaults to 1.
+        i_grid_chunks (int, optional): number of tasks the grid is split into for every fold,
+        more tasks keep more workers busy, but every task repeats the work shared by its
+        parameter-sets. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: one row per fold and parameter-set with the parameters, the fold
+        and the score
+    """
+    # contiguous chunks, so parameter-sets sharing their slower parameters stay together
+    lst_np_chunks = [
+        np_chunk for np_chunk in np.array_split(np.arange(len(lst_dct_params)), i_grid_chunks)
+        if len(np_chunk) > 0
+    ]
+
+    lst_tpl_tasks = [
+        (ii, np_chunk)
+        for ii in range(len(lst_tpl_folds))
+        for np_chunk in lst_np_chunks
+    ]
+
+    def lst_args(tpl_task):
+        ii, np_chunk = tpl_task
+
+        return (*lst_tpl_folds[ii], [lst_dct_params[jj] for jj in np_chunk])
+
+    if i_workers == 1:
+        lst_results = [fn_scores(*lst_args(tt)) for tt in lst_tpl_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=i_workers) as executor:
+            lst_results = list(executor.map(fn_scores, *zip(*map(lst_args, lst_tpl_tasks))))
+
+    lst_dct_rows = []
+
+    for (ii, np_chunk), np_scores in zip(lst_tpl_tasks, lst_results):
+        for jj, f_score in zip(np_chunk, np.asarray(np_scores, dtype=np.float64)):
+            lst_dct_rows.append({**lst_dct_params[jj], "fold": ii, "score": f_score})
+
+    return pd.DataFrame(lst_dct_rows)
+
+def df_summary(df_scores: pd.DataFrame) -> pd.DataFrame:
+    """mean, standard-deviation and extremes of the scores of every parameter-set over the folds
+
+    Args:
+        df_scores (pd.DataFrame): scores of `df_cross_validate`
+
+    Returns:
+        pd.DataFrame: one row per parameter-set, the best mean first
+    """
+    lst_s_params = [cc for cc in df_scores.columns if cc not in ("fold", "score")]
+
+    # the parameters can be lists (e.g. bounds), which can't be grouped
+    sr_keys = df_scores[lst_s_params].apply(lambda sr: repr(sr.tolist()), axis=1)
+
+    df_summary = df_scores.groupby(sr_keys, sort=False).agg(
+        **{pp: (pp, "first") for pp in lst_s_params},
+        mean=("score", "mean"),
+        std=("score", "std"),
+        min=("score", "min"),
+        max=("score", "max"),
+        folds=("score", "size")
+    )
+
+    return df_summary.sort_values("mean", ascending=False, kind="stable").reset_index(drop=True)
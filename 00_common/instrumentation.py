@@ -0,0 +1,152 @@
+"""opt-in measurement of the wall-time, cpu-time, peak memory and rows of the stages of a script
+
+the measurement is switched on with environment-variables, so a run can be measured without
+changing the code:
+    STAGE_LOG=1           print every finished stage to stderr
+    STAGE_TRACE=<file>    write all the finished stages as json into the file at the end of `run`
+    STAGE_PROFILE=<file>  profile `run` with cProfile and store the statistics in the file
+
+without them `stage` only yields an empty record, so the stages cost next to nothing
+"""
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on windows, the peak memory is left out there
+    resource = None
+
+# wether to print every finished stage
+B_LOG = os.environ.get("STAGE_LOG", "") not in ("", "0")
+# file for the json-trace of all the stages, None for no trace
+S_TRACE_FILE = os.environ.get("STAGE_TRACE") or None
+# file for the cProfile-statistics, None for no profile
+S_PROFILE_FILE = os.environ.get("STAGE_PROFILE") or None
+
+# wether the stages are measured at all
+B_ENABLED = B_LOG or S_TRACE_FILE is not None
+
+# start of the process, the stages are stored relative to it
+F_START = time.perf_counter()
+
+# records of the finished stages
+LST_RECORDS: list[dict] = []
+# names of the currently running stages, the nested stages are named by their path
+LST_S_STACK: list[str] = []
+
+def f_peak_rss_mib() -> float | None:
+    """peak resident memory of the process so far
+
+    Returns:
+        float | None: peak memory in MiB, None if it can't be measured on this platform
+    """
+    if resource is None:
+        return None
+
+    i_max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # bytes on macos, kibibytes everywhere else
+    return i_max_rss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+@contextlib.contextmanager
+def stage(s_name: str, i_rows: int | None = None):
+    """measure a stage of the script
+
+    Args:
+        s_name (str): name of the stage
+        i_rows (int | None, optional): number of processed rows, can also be set later
+        through the yielded record. Defaults to None.
+
+    Yields:
+        dict: record of the stage, set "rows" to add the number of processed rows
+    """
+    dct_record = {"rows": i_rows}
+
+    if not B_ENABLED:
+        yield dct_record
+
+        return
+
+    LST_S_STACK.append(s_name)
+
+    f_wall = time.perf_counter()
+    f_cpu = time.process_time()
+
+    try:
+        yield dct_record
+    finally:
+        f_end = time.perf_counter()
+
+        dct_finished = {
+            "stage": "/".join(LST_S_STACK),
+            "start_s": f_wall - F_START,
+            "wall_s": f_end - f_wall,
+            "cpu_s": time.process_time() - f_cpu,
+            "peak_rss_mib": f_peak_rss_mib(),
+            "rows": dct_record["rows"]
+        }
+
+        LST_S_STACK.pop()
+        LST_RECORDS.append(dct_finished)
+
+        if B_LOG:
+            log_record(dct_finished)
+
+def log_record(dct_record: dict):
+    """print the record of a finished stage to stderr
+
+    Args:
+        dct_record (dict): record of the stage
+    """
+    s_line = (
+        f"[stage] {dct_record['stage']}: {dct_record['wall_s']:.3f} s wall, "
+        f"{dct_record['cpu_s']:.3f} s cpu"
+    )
+
+    if dct_record["peak_rss_mib"] is not None:
+        s_line += f", {dct_record['peak_rss_mib']:.1f} MiB peak rss"
+
+    if dct_record["rows"] is not None:
+        s_line += f", {dct_record['rows']} rows"
+
+    print(s_line, file=sys.stderr)
+
+def write_trace(s_file: str):
+    """write the records of all the finished stages as json into a file
+
+    Args:
+        s_file (str): path of the file
+    """
+    with open(s_file, "w", encoding="utf-8") as file:
+        json.dump({"argv": sys.argv, "stages": LST_RECORDS}, file, indent=4)
+
+def run(fn_main, *args, **kwargs):
+    """run the main-function of a script as the outermost stage, profile it and write the trace,
+    if it is requested by the environment-variables
+
+    Args:
+        fn_main (callable): main-function of the script
+
+    Returns:
+        the result of the main-function
+    """
+    profiler = cProfile.Profile() if S_PROFILE_FILE is not None else None
+
+    try:
+        if profiler is not None:
+            profiler.enable()
+
+        with stage("main"):
+            return fn_main(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(S_PROFILE_FILE)
+
+        if S_TRACE_FILE is not None:
+            write_trace(S_TRACE_FILE)
@@ -0,0 +1,178 @@
+"""benchmark of the stages of the grading in main.py with synthetic homeworks
+
+run it from this directory, e.g. `python benchmark.py --scales 1000:10 100000:50 --out bench.json`
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import create_test_files
+import main as grading
+
+# default scales as number of students and number of homework-files
+LST_S_SCALES = ["1000:10", "100000:50", "1000000:200"]
+OUT_FILE = Path("benchmark.json") # output-file for the results
+
+def main(lst_args: list[str] | None = None):
+    args = parse_args(lst_args)
+
+    lst_results = []
+
+    for ss in args.scales:
+        i_students, i_files = (int(ii) for ii in ss.split(":"))
+
+        lst_results.extend(lst_benchmark_scale(i_students, i_files, args))
+
+    dct_out = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": lst_results
+    }
+
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump(dct_out, file, indent=4)
+
+    for dd in lst_results:
+        print(
+            f"{dd['students']:>9} students {dd['files']:>4} files {dd['stage']:<16}"
+            f"{dd['wall_s']:>10.3f} s {dd['cpu_s']:>10.3f} s cpu"
+            f"{dd.get('peak_mib', float('nan')):>10.1f} MiB"
+        )
+
+def parse_args(lst_args: list[str] | None = None) -> argparse.Namespace:
+    """_summary_ parse the command-line arguments
+
+    Args:
+        lst_args (list[str] | None, optional): _description_ arguments, None for the ones of
+        the command-line. Defaults to None.
+
+    Returns:
+        argparse.Namespace: _description_ parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="benchmark the stages of the grading")
+
+    parser.add_argument("--scales", nargs="+", default=LST_S_SCALES, metavar="STUDENTS:FILES",
+                        help="number of students and homework-files of every dataset")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated homeworks")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="number of timed runs per scale, the fastest one is reported")
+    parser.add_argument("--load-workers", type=int, default=1,
+                        help="number of processes parsing the csv-files")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the extra run which traces the memory of every stage")
+    parser.add_argument("--out", type=Path, default=OUT_FILE, help="output-file for the results")
+
+    return parser.parse_args(lst_args)
+
+def lst_benchmark_scale(i_students: int, i_files: int, args: argparse.Namespace) -> list[dict]:
+    """_summary_ generate a dataset and measure every stage of the grading on it
+
+    Args:
+        i_students (int): _description_ number of students
+        i_files (int): _description_ number of homework-files
+        args (argparse.Namespace): _description_ parsed command-line arguments
+
+    Returns:
+        list[dict]: _description_ measurements of every stage
+    """
+    pth_cwd = Path.cwd()
+
+    with tempfile.TemporaryDirectory() as s_tmp_dir:
+        # the grading uses paths relative to the working directory
+        os.chdir(s_tmp_dir)
+
+        try:
+            create_test_files.main([
+                "--students", str(i_students),
+                "--files", str(i_files),
+                "--seed", str(args.seed),
+                "--out-dir", str(grading.CSV_DIR),
+                "--workers", "0"
+            ])
+
+            # fastest run of every stage
+            dct_timings = {}
+
+            for _ in range(args.repeat):
+                for dd in lst_run_stages(args.load_workers, False):
+                    if dd["stage"] not in dct_timings or dd["wall_s"] < dct_timings[dd["stage"]]["wall_s"]:
+                        dct_timings[dd["stage"]] = dd
+
+            # memory in a separate run, tracing slows down the stages
+            if not args.no_memory:
+                for dd in lst_run_stages(1, True):
+                    dct_timings[dd["stage"]]["peak_mib"] = dd["peak_mib"]
+        finally:
+            os.chdir(pth_cwd)
+
+    return [{"students": i_students, "files": i_files, **dd} for dd in dct_timings.values()]
+
+def lst_run_stages(i_load_workers: int, b_trace_memory: bool) -> list[dict]:
+    """_summary_ run the stages of the in-memory grading one after another
+
+    Args:
+        i_load_workers (int): _description_ number of processes parsing the csv-files
+        b_trace_memory (bool): _description_ wether to measure the peak of the memory
+        allocated in every stage
+
+    Returns:
+        list[dict]: _description_ stage, wall-time, cpu-time, number of rows and
+        (if traced) peak memory of every stage
+    """
+    lst_measures = []
+
+    def run_stage(s_stage: str, fn, *args):
+        if b_trace_memory:
+            tracemalloc.start()
+
+        f_wall = time.perf_counter()
+        f_cpu = time.process_time()
+
+        result = fn(*args)
+
+        dct_measure = {
+            "stage": s_stage,
+            "wall_s": time.perf_counter() - f_wall,
+            "cpu_s": time.process_time() - f_cpu
+        }
+
+        if b_trace_memory:
+            dct_measure["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+
+        lst_measures.append(dct_measure)
+
+        return result
+
+    grading.OUT_DIR_STUDENTS.mkdir(parents=True, exist_ok=True)
+
+    lst_csv_paths = grading.lst_find_csv_files(grading.CSV_DIR)
+
+    dct_dataframes = run_stage("load", grading.dct_load_csv_files, lst_csv_paths, i_load_workers)
+    lst_measures[-1]["rows"] = sum(len(dd) for dd in dct_dataframes.values())
+
+    run_stage("validate", grading.validate_dataframes, dct_dataframes)
+
+    gb_master = run_stage("merge", grading.gb_merge_dataframes_from_list, list(dct_dataframes.values()))
+    lst_measures[-1]["rows"] = len(gb_master.idx_students)
+
+    sr_max_points = run_stage("max_points", gb_master.sr_max_points)
+
+    # without old hashes every file is written
+    run_stage("export_students", grading.dct_export_student_rows, gb_master, {})
+    lst_measures[-1]["rows"] = len(gb_master.idx_students)
+
+    run_stage("export_percent", grading.export_students_percent, gb_master, sr_max_points)
+
+    return lst_measures
+
+if __name__ == "__main__":
+    main()
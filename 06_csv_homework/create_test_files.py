@@ -1,7 +1,7 @@
 """path handling"""
 from pathlib import Path
-import random
-import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import shutil
 import pandas as pd
 import numpy as np
@@ -11,45 +11,108 @@ FILE_COUNT = 10
 RANGE_TASKS = (1, 10)
 RANGE_POINTS = (0, 5)
 RANGE_TASK_ATTENDENCE = (0.4, 0.9)
+# the matricle-numbers are drawn from this range, it grows if there are more students
+RANGE_MAT_NUM = (10000, 100000)
 OUT_DIR = Path("csv")
 DELIMITER = ';'
 
-DF_NAMES = pd.read_csv(Path("names.csv"), delimiter=';')
+# the names are next to this script, so the files can be created from any directory
+DF_NAMES = pd.read_csv(Path(__file__).resolve().parent / "names.csv", delimiter=';')
 
-def main():
-    # setup the output directory
-    create_empty_dir(OUT_DIR)
-
-    lst_students: list[tuple[str, str, int]] = []
-
-    set_unique_numbers: set[int] = set()
-
-    # create unique numbers for every student
-    while len(set_unique_numbers) < STUDENTS_TOTAL:
-        set_unique_numbers.add(random.randint(10000, 99999))
-
-    for ii in set_unique_numbers:
-        names = s_get_random_name().values.tolist()[0]
-        names.append(ii)
-
-        lst_students.append(names)
-
-    df_students = pd.DataFrame(lst_students, columns=["name", "vorname", "Matr-Nr"])
-
-    for _ in range(FILE_COUNT):
-        attendance = random.random()
-        attendance *= (RANGE_TASK_ATTENDENCE[1] - RANGE_TASK_ATTENDENCE[0])
-        attendance += RANGE_TASK_ATTENDENCE[0]
+def main(lst_args: list[str] | None = None):
+    args = parse_args(lst_args)
 
-        df_scores = create_scores(df_students.sample(frac=attendance), random.randint(*RANGE_TASKS), RANGE_POINTS)
+    # setup the output directory
+    create_empty_dir(args.out_dir)
+
+    # independent random-generators for the students and every file, so the files are the
+    # same for the same seed, no matter how many workers write them
+    ss_students, *lst_ss_files = np.random.SeedSequence(args.seed).spawn(args.files + 1)
+
+    rng = np.random.default_rng(ss_students)
+
+    df_students = df_create_students(rng, args.students)
+
+    # files (numbered from 1) with a duplicated student or a malformed column
+    np_files = np.arange(1, args.files + 1)
+    set_duplicates = set(rng.choice(np_files, size=args.duplicates, replace=False).tolist())
+    set_malformed = set(rng.choice(np_files, size=args.malformed, replace=False).tolist())
+
+    lst_tasks = [
+        (
+            df_students,
+            args.out_dir / f"homework_{ii:0{len(str(args.files))}d}.csv",
+            ss,
+            tuple(args.tasks),
+            tuple(args.points),
+            tuple(args.attendance),
+            ii in set_duplicates,
+            ii in set_malformed
+        )
+        for ii, ss in enumerate(lst_ss_files, 1)
+    ]
+
+    if args.workers == 1:
+        lst_tpl_injected = [create_file(*tt) for tt in lst_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            lst_tpl_injected = list(executor.map(create_file, *zip(*lst_tasks)))
+
+    # e.g. a file without attending students can't have a duplicate
+    i_duplicates = sum(bb for bb, _ in lst_tpl_injected)
+    i_malformed = sum(bb for _, bb in lst_tpl_injected)
+
+    if i_duplicates != args.duplicates or i_malformed != args.malformed:
+        raise ValueError(
+            f"only {i_duplicates} of {args.duplicates} files have a duplicated student and "
+            f"{i_malformed} of {args.malformed} files a malformed column, "
+            "more students or tasks are needed"
+        )
+
+def parse_args(lst_args: list[str] | None = None) -> argparse.Namespace:
+    """_summary_ parse the command-line arguments
 
-        store_df_to_file(df_scores)
+    Args:
+        lst_args (list[str] | None, optional): _description_ arguments, None for the ones of
+        the command-line. Defaults to None.
 
+    Returns:
+        argparse.Namespace: _description_ parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="create random homework csv-files")
+
+    parser.add_argument("--students", type=int, default=STUDENTS_TOTAL, help="number of students")
+    parser.add_argument("--files", type=int, default=FILE_COUNT, help="number of homework-files")
+    parser.add_argument("--tasks", type=int, nargs=2, default=RANGE_TASKS, metavar=("MIN", "MAX"),
+                        help="range of the number of tasks per homework")
+    parser.add_argument("--points", type=int, nargs=2, default=RANGE_POINTS, metavar=("MIN", "MAX"),
+                        help="range of the points per task (MAX is exclusive)")
+    parser.add_argument("--attendance", type=float, nargs=2, default=RANGE_TASK_ATTENDENCE,
+                        metavar=("MIN", "MAX"), help="range of the fraction of attending students")
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR, help="output directory")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random-generator")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes writing the files, 0 for the number of cpus")
+    parser.add_argument("--duplicates", type=int, default=0,
+                        help="number of files with a student appearing twice")
+    parser.add_argument("--malformed", type=int, default=0,
+                        help="number of files with a column which isn't a task")
+
+    args = parser.parse_args(lst_args)
+
+    # 0 lets the pool choose the number of processes
+    args.workers = args.workers or None
+
+    for ss in ("duplicates", "malformed"):
+        if not 0 <= getattr(args, ss) <= args.files:
+            parser.error(f"--{ss} has to be between 0 and the number of files ({args.files})")
+
+    return args
 
 def create_empty_dir(directory: Path) -> None:
     """_summary_
     ensures, that a specified path is an empty dir, deletes files if necessary
-    
+
     Args:
         directory (Path): _description_ path of the directory
     """
@@ -58,18 +121,36 @@ def create_empty_dir(directory: Path) -> None:
         shutil.rmtree(directory)
 
     # create the dir
-    OUT_DIR.mkdir()
+    directory.mkdir(parents=True)
+
+def df_create_students(rng: np.random.Generator, i_count: int) -> pd.DataFrame:
+    """_summary_ create students with random names and unique matricle-numbers
+
+    Args:
+        rng (np.random.Generator): _description_ random-generator
+        i_count (int): _description_ number of students
 
-def get_score(max: int) -> int:
-    return random.randint(0, max)
+    Returns:
+        pd.DataFrame: _description_ students with the columns "name", "vorname" and "Matr-Nr"
+    """
+    # draw the numbers without replacement, the range grows if it's too small
+    i_low = RANGE_MAT_NUM[0]
+    i_high = max(RANGE_MAT_NUM[1], i_low + 2 * i_count)
+
+    np_numbers = rng.choice(i_high - i_low, size=i_count, replace=False) + i_low
 
-def s_get_random_name() -> pd.DataFrame:
-    name = DF_NAMES.sample(n = 1)
+    # pick all the names at once
+    np_names = DF_NAMES.to_numpy()[rng.integers(len(DF_NAMES), size=i_count)]
 
-    return name
+    return pd.DataFrame({"name": np_names[:, 0], "vorname": np_names[:, 1], "Matr-Nr": np_numbers})
 
-def create_scores(df_students: pd.DataFrame, i_count_tasks: int, tpl_i_point_range: tuple[int, int]):
-    df_points = np.random.default_rng().integers(*tpl_i_point_range, (len(df_students), i_count_tasks))
+def create_scores(
+        rng: np.random.Generator,
+        df_students: pd.DataFrame,
+        i_count_tasks: int,
+        tpl_i_point_range: tuple[int, int]
+    ) -> pd.DataFrame:
+    df_points = rng.integers(*tpl_i_point_range, (len(df_students), i_count_tasks))
 
     columns = [f"A{ii + 1}" for ii in range(i_count_tasks)]
 
@@ -77,9 +158,64 @@ def create_scores(df_students: pd.DataFrame, i_count_tasks: int, tpl_i_point_ran
 
     return pd.concat([df_students, df_points], axis=1)
 
-def store_df_to_file(data: pd.DataFrame) -> None:
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", encoding="utf-8", dir=OUT_DIR, delete=False) as out_file:
+def create_file(
+        df_students: pd.DataFrame,
+        pth_file: Path,
+        seed: np.random.SeedSequence,
+        tpl_i_task_range: tuple[int, int],
+        tpl_i_point_range: tuple[int, int],
+        tpl_f_attendance_range: tuple[float, float],
+        b_duplicate: bool = False,
+        b_malformed: bool = False
+    ) -> tuple[bool, bool]:
+    """_summary_ create the scores of a single homework and write them into a csv-file
+
+    Args:
+        df_students (pd.DataFrame): _description_ all the students
+        pth_file (Path): _description_ path of the csv-file
+        seed (np.random.SeedSequence): _description_ seed of the random-generator of the file
+        tpl_i_task_range (tuple[int, int]): _description_ range of the number of tasks
+        tpl_i_point_range (tuple[int, int]): _description_ range of the points per task
+        tpl_f_attendance_range (tuple[float, float]): _description_ range of the fraction of
+        attending students
+        b_duplicate (bool, optional): _description_ wether a student appears twice.
+        Defaults to False.
+        b_malformed (bool, optional): _description_ wether a column isn't a task.
+        Defaults to False.
+
+    Returns:
+        tuple[bool, bool]: _description_ wether a student appears twice and wether a column
+        isn't a task in the written file
+    """
+    rng = np.random.default_rng(seed)
+
+    attendance = rng.uniform(*tpl_f_attendance_range)
+
+    # random subset of the students in a random order
+    np_attending = rng.choice(len(df_students), size=round(len(df_students) * attendance), replace=False)
+
+    i_count_tasks = int(rng.integers(tpl_i_task_range[0], tpl_i_task_range[1] + 1))
+
+    df_scores = create_scores(rng, df_students.iloc[np_attending], i_count_tasks, tpl_i_point_range)
+
+    b_duplicate = b_duplicate and len(df_scores) > 0
+    # without tasks the last column is an identifier of the students
+    b_malformed = b_malformed and i_count_tasks > 0
+
+    if b_duplicate:
+        df_scores = pd.concat([df_scores, df_scores.iloc[[rng.integers(len(df_scores))]]])
+
+    if b_malformed:
+        s_task = df_scores.columns[-1]
+        df_scores = df_scores.rename(columns={s_task: f"Aufgabe {s_task[1:]}"})
+
+    store_df_to_file(df_scores, pth_file)
+
+    return b_duplicate, b_malformed
+
+def store_df_to_file(data: pd.DataFrame, pth_file: Path) -> None:
+    with open(pth_file, mode="w", encoding="utf-8") as out_file:
         data.to_csv(out_file, sep=DELIMITER, lineterminator='\n', index=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,231 @@
+"""grade multiple courses in a single process with a shared pool of worker-processes
+
+every course is a directory with a "csv" directory with the homeworks, the results are
+written into its "output" directory; alternatively the courses are listed in a json config-file:
+
+    {
+        "defaults": {"delimiter": ";", "output_student_names": true},
+        "courses": [
+            {"csv_dir": "course_a/csv", "out_dir": "course_a/output", "cache_dir": "course_a/.cache"},
+            {"csv_dir": "course_b/homeworks", "out_dir": "course_b/results", "streaming": true}
+        ]
+    }
+
+the options are the ones of `main.configure`, relative paths are relative to the config-file
+
+    python driver.py course_a course_b --workers 8
+    python driver.py --config courses.json --plan
+"""
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import json
+import sys
+import traceback
+
+import main as grading
+
+# estimated bytes of the identifier (matricle-number and names) of a parsed row
+I_BYTES_PER_INDEX_ROW = 128
+# estimated bytes of a parsed value
+I_BYTES_PER_VALUE = 8
+# estimated bytes of an entry of the sparse gradebook (student, task and points),
+# including the temporary arrays of the merge
+I_BYTES_PER_ENTRY = 48
+# estimated bytes of the running sums of a student in the streaming-mode
+I_BYTES_PER_STREAMED_STUDENT = 256
+# estimated bytes of the sums of an attended homework of a student in the streaming-mode,
+# only kept for the scheme "homework_mean", including the temporary arrays of the merge
+I_BYTES_PER_STREAMED_HOMEWORK = 96
+
+def main(lst_args: list[str] | None = None) -> int:
+    args = parse_args(lst_args)
+
+    lst_courses = lst_load_courses(args)
+
+    if args.plan:
+        for dd in lst_courses:
+            print_plan(dd)
+
+        return 0
+
+    # restore the defaults of the module between the courses
+    dct_defaults = grading.dct_get_config()
+
+    lst_failed = []
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        grading.LOAD_EXECUTOR = executor
+
+        try:
+            for dd in lst_courses:
+                try:
+                    # e.g. an unknown option only fails this course
+                    grading.configure(**{**dct_defaults, **dd})
+
+                    print(f"grading {grading.CSV_DIR} -> {grading.OUT_DIR}")
+
+                    if not grading.CSV_DIR.is_dir():
+                        raise FileNotFoundError(f"the csv-directory {grading.CSV_DIR} doesn't exist")
+
+                    with grading.instrumentation.stage(f"course {grading.CSV_DIR}"):
+                        grading.main()
+                except Exception:
+                    # the other courses are still graded
+                    traceback.print_exc()
+                    lst_failed.append(str(dd.get("csv_dir", dd)))
+        finally:
+            grading.LOAD_EXECUTOR = None
+            grading.configure(**dct_defaults)
+
+    if lst_failed:
+        print(f"{len(lst_failed)} of {len(lst_courses)} courses failed: {lst_failed}", file=sys.stderr)
+
+        return 1
+
+    return 0
+
+def parse_args(lst_args: list[str] | None = None) -> argparse.Namespace:
+    """_summary_ parse the command-line arguments
+
+    Args:
+        lst_args (list[str] | None, optional): _description_ arguments, None for the ones of
+        the command-line. Defaults to None.
+
+    Returns:
+        argparse.Namespace: _description_ parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="grade the homeworks of multiple courses")
+
+    parser.add_argument("courses", nargs="*", type=Path,
+                        help="course-directories with a \"csv\" directory of the homeworks")
+    parser.add_argument("--config", type=Path, default=None, help="json config-file of the courses")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes parsing the csv-files of all the courses")
+    parser.add_argument("--plan", action="store_true",
+                        help="only list the files to parse or skip and estimate the memory")
+
+    args = parser.parse_args(lst_args)
+
+    if not args.courses and args.config is None:
+        parser.error("either course-directories or --config are required")
+
+    return args
+
+def lst_load_courses(args: argparse.Namespace) -> list[dict]:
+    """_summary_ options of every course from the course-directories and the config-file
+
+    Args:
+        args (argparse.Namespace): _description_ parsed command-line arguments
+
+    Returns:
+        list[dict]: _description_ options of `main.configure` of every course
+    """
+    lst_courses = [
+        {"csv_dir": pp / "csv", "out_dir": pp / "output", "cache_dir": pp / ".cache"}
+        for pp in args.courses
+    ]
+
+    if args.config is not None:
+        with open(args.config, encoding="utf-8") as file:
+            dct_config = json.load(file)
+
+        for dd in dct_config.get("courses", []):
+            dct_course = {**dct_config.get("defaults", {}), **dd}
+
+            # relative paths are relative to the config-file
+            for kk in ("csv_dir", "out_dir", "cache_dir"):
+                if kk in dct_course:
+                    dct_course[kk] = args.config.parent / dct_course[kk]
+
+            lst_courses.append(dct_course)
+
+    return lst_courses
+
+def tpl_scan_file(pth_file: Path) -> tuple[str, int, bytes]:
+    """_summary_ read a file once to get its hash, its number of lines and its header
+
+    Args:
+        pth_file (Path): _description_ path of the file
+
+    Returns:
+        tuple[str, int, bytes]: _description_ sha256-hash as hex-string (the same as
+        `main.s_hash_file`), number of lines and the first line
+    """
+    hash_file = hashlib.sha256()
+    i_lines = 0
+    b_header = b""
+
+    with open(pth_file, "rb") as file:
+        for bb in iter(lambda: file.read(1 << 20), b""):
+            if not b_header:
+                b_header = bb.split(b"\n", 1)[0]
+
+            hash_file.update(bb)
+            i_lines += bb.count(b"\n")
+
+    return hash_file.hexdigest(), i_lines, b_header
+
+def print_plan(dct_course: dict):
+    """_summary_ list the files of a course, which would be parsed or skipped, and estimate the memory,
+    without parsing any file
+
+    Args:
+        dct_course (dict): _description_ options of `main.configure` of the course
+    """
+    dct_defaults = grading.dct_get_config()
+
+    grading.configure(**{**dct_defaults, **dct_course})
+
+    try:
+        pth_cache_dir = grading.pth_course_cache_dir()
+        dct_options = grading.dct_csv_options()
+
+        lst_csv_paths = grading.lst_find_csv_files(grading.CSV_DIR)
+
+        print(f"course {grading.CSV_DIR} -> {grading.OUT_DIR} ({len(lst_csv_paths)} files, "
+              f"{'streaming' if grading.STREAMING else 'incremental' if grading.INCREMENTAL else 'full'})")
+
+        i_rows_total = 0
+        i_values_total = 0
+        i_max_chunk = 0
+
+        for ff in lst_csv_paths:
+            s_hash, i_lines, b_header = tpl_scan_file(ff)
+
+            # the header is one of the lines, the identifiers aren't tasks
+            i_rows = max(i_lines - 1, 0)
+            i_tasks = max(len(b_header.decode("utf-8", "replace").split(grading.DELIMITER)) - 3, 0)
+
+            b_cached = (
+                grading.INCREMENTAL and not grading.STREAMING
+                and grading.pth_cache_entry(pth_cache_dir, s_hash, dct_options).exists()
+            )
+
+            print(f"    {'skip ' if b_cached else 'parse'} {ff} ({i_rows} rows, {i_tasks} tasks)")
+
+            i_rows_total += i_rows
+            i_values_total += i_rows * i_tasks
+            i_max_chunk = max(i_max_chunk, min(i_rows, grading.STREAMING_CHUNK_ROWS) * (i_tasks + 3))
+
+        if grading.STREAMING:
+            # a chunk and the sums of every student (at most one per row)
+            i_bytes = i_max_chunk * I_BYTES_PER_VALUE + i_rows_total * I_BYTES_PER_STREAMED_STUDENT
+
+            # and the sums of every attended homework (one per row)
+            if grading.SCORING_SCHEME == "homework_mean":
+                i_bytes += i_rows_total * I_BYTES_PER_STREAMED_HOMEWORK
+        else:
+            # all the parsed files (also the cached ones) and the gradebook
+            i_bytes = (
+                i_rows_total * I_BYTES_PER_INDEX_ROW
+                + i_values_total * (I_BYTES_PER_VALUE + I_BYTES_PER_ENTRY)
+            )
+
+        print(f"    estimated memory: {i_bytes / 2 ** 20:.1f} MiB for {i_rows_total} rows")
+    finally:
+        grading.configure(**dct_defaults)
+
+if __name__ == "__main__":
+    sys.exit(grading.instrumentation.run(main))
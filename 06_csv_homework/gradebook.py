@@ -0,0 +1,160 @@
+"""sparse storage of the points of all the students at all the tasks"""
+import numpy as np
+import pandas as pd
+
+class SparseGradebook:
+    """_summary_ points of all the students at all the tasks in a compressed-sparse-row layout:
+    only the attended tasks are stored, so the memory grows with the number of submissions
+    instead of students times tasks
+    """
+    # identifier (matricle-number, sire-name, fore-name) of every student (row),
+    # in the order of their first appearance
+    idx_students: pd.MultiIndex
+    # name of every task (column)
+    idx_tasks: pd.Index
+    # homework (index of the dataframe, starting at 0) of every task
+    np_task_homework: np.ndarray
+    # range of the entries of every student in `np_task_codes` and `np_points`
+    np_indptr: np.ndarray
+    # task of every entry, ascending within every student
+    np_task_codes: np.ndarray
+    # points of every entry
+    np_points: np.ndarray
+
+    def __init__(self, lst_dataframes: list[pd.DataFrame]):
+        """_summary_ combine dataframes with the students as index and the tasks as columns,
+        every dataframe adds its own columns (like a concat along the columns)
+
+        Args:
+            lst_dataframes (list[pd.DataFrame]): _description_ points of the individual
+            homeworks, the index of every dataframe must be unique
+        """
+        idx_all = lst_dataframes[0].index.append([dd.index for dd in lst_dataframes[1:]])
+
+        # codebook of the students
+        np_all_codes, idx_students = idx_all.factorize()
+
+        self.idx_students = idx_students.set_names(idx_all.names)
+        self.idx_tasks = lst_dataframes[0].columns.append([dd.columns for dd in lst_dataframes[1:]])
+        self.np_task_homework = np.repeat(
+            np.arange(len(lst_dataframes)), [dd.shape[1] for dd in lst_dataframes]
+        )
+
+        lst_np_rows = []
+        lst_np_tasks = []
+        lst_np_points = []
+
+        i_row_offset = 0
+        i_task_offset = 0
+
+        for dd in lst_dataframes:
+            np_frame = dd.to_numpy()
+
+            # only the attended tasks (without NaN values)
+            np_rows, np_columns = np.nonzero(pd.notna(np_frame))
+
+            lst_np_rows.append(np_all_codes[i_row_offset + np_rows])
+            lst_np_tasks.append(i_task_offset + np_columns)
+            lst_np_points.append(np_frame[np_rows, np_columns])
+
+            i_row_offset += dd.shape[0]
+            i_task_offset += dd.shape[1]
+
+        np_rows = np.concatenate(lst_np_rows)
+        np_tasks = np.concatenate(lst_np_tasks)
+        np_points = np.concatenate(lst_np_points)
+
+        # a dense layout has NaN for the missing points, so the points are only integers
+        # if every student attended every task
+        if len(np_points) < len(self.idx_students) * len(self.idx_tasks):
+            np_points = np_points.astype(np.float64)
+
+        # sort the entries by the student and then by the task
+        np_order = np.lexsort((np_tasks, np_rows))
+
+        self.np_task_codes = np_tasks[np_order]
+        self.np_points = np_points[np_order]
+        self.np_indptr = np.concatenate((
+            [0],
+            np.cumsum(np.bincount(np_rows, minlength=len(self.idx_students)))
+        ))
+
+    @classmethod
+    def from_arrays(
+            cls,
+            idx_students: pd.MultiIndex,
+            idx_tasks: pd.Index,
+            np_task_homework: np.ndarray,
+            np_indptr: np.ndarray,
+            np_task_codes: np.ndarray,
+            np_points: np.ndarray
+        ) -> "SparseGradebook":
+        """_summary_ gradebook of already compressed arrays, e.g. of a stored gradebook
+
+        Args:
+            idx_students (pd.MultiIndex): _description_ identifier of every student
+            idx_tasks (pd.Index): _description_ name of every task
+            np_task_homework (np.ndarray): _description_ homework of every task
+            np_indptr (np.ndarray): _description_ range of the entries of every student
+            np_task_codes (np.ndarray): _description_ task of every entry
+            np_points (np.ndarray): _description_ points of every entry
+
+        Raises:
+            ValueError: if the lengths of the arrays don't match
+
+        Returns:
+            SparseGradebook: _description_ gradebook using the arrays without copying them
+        """
+        if len(np_indptr) != len(idx_students) + 1 or len(np_task_homework) != len(idx_tasks) \
+                or np_indptr[-1] != len(np_task_codes) or len(np_task_codes) != len(np_points):
+            raise ValueError("the arrays of the gradebook don't match")
+
+        gb_points = cls.__new__(cls)
+
+        gb_points.idx_students = idx_students
+        gb_points.idx_tasks = idx_tasks
+        gb_points.np_task_homework = np_task_homework
+        gb_points.np_indptr = np_indptr
+        gb_points.np_task_codes = np_task_codes
+        gb_points.np_points = np_points
+
+        return gb_points
+
+    def np_student_codes(self) -> np.ndarray:
+        """_summary_ student (row) of every entry
+
+        Returns:
+            np.ndarray: _description_ index of the student in `idx_students` of every entry
+        """
+        return np.repeat(np.arange(len(self.idx_students)), np.diff(self.np_indptr))
+
+    def sr_max_points(self) -> pd.Series:
+        """_summary_ maximum points obtained in every single task
+
+        Returns:
+            pd.Series: _description_ maximum points of every task, NaN if nobody attended it
+        """
+        np_max_points = np.full(len(self.idx_tasks), np.nan)
+
+        np.fmax.at(np_max_points, self.np_task_codes, self.np_points)
+
+        return pd.Series(np_max_points, index=self.idx_tasks)
+
+    def df_dense(self) -> pd.DataFrame:
+        """_summary_ points as a dense dataframe
+
+        Returns:
+            pd.DataFrame: _description_ dataframe with the students as index and the tasks as
+            columns, NaN for the tasks which weren't attended
+        """
+        tpl_shape = (len(self.idx_students), len(self.idx_tasks))
+
+        # without missing points the dtype of the points is kept
+        if len(self.np_points) == tpl_shape[0] * tpl_shape[1]:
+            np_dense = np.empty(tpl_shape, dtype=self.np_points.dtype)
+        else:
+            np_dense = np.full(tpl_shape, np.nan)
+
+        np_dense[self.np_student_codes(), self.np_task_codes] = self.np_points
+
+        return pd.DataFrame(np_dense, index=self.idx_students, columns=self.idx_tasks)
@@ -1,9 +1,25 @@
 """easy path handling"""
 from pathlib import Path
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
 import shutil
+import sys
 import re
+import numpy as np
 import pandas as pd
 
+from gradebook import SparseGradebook
+from scoring import ScoreAccumulator, np_passed
+
+# shared modules of all the homeworks
+sys.path.append(str(Path(__file__).resolve().parent.parent / "00_common"))
+import instrumentation
+
 CSV_DIR = Path("csv") # path of the directory with the input files from ILIAS
 OUT_DIR = Path("output") # master-output-directory
 # output-directory for the results of the individual students
@@ -12,78 +28,608 @@ OUT_FILE_RESULTS = OUT_DIR / "results.csv" # output-file for the percentage outp
 DELIMITER = ';' # delimiter of the csv-files
 QUOTE_CHAR = '"'
 OUTPUT_STUDENT_NAMES = False # wether to output the student names or only their matricle number
+# wether to read the csv-files in chunks and only keep running aggregates in memory,
+# the memory use doesn't depend on the number of homework-files
+STREAMING = False
+STREAMING_CHUNK_ROWS = 10000 # number of rows read at once in the streaming-mode
+# number of processes to parse the csv-files with, None for the number of cpus, 1 to parse
+# them one after another
+LOAD_WORKERS = None
+# process-pool shared by multiple runs (e.g. of multiple courses) to parse the csv-files with,
+# None to create a new pool with `LOAD_WORKERS` processes for every run
+LOAD_EXECUTOR: Executor | None = None
+# wether to reuse the results of the last run: only new or changed csv-files are parsed and
+# only the files of students with changed points are rewritten, instead of recreating the
+# output directory
+INCREMENTAL = False
+# directory with the parsed csv-files of the last runs, every csv-directory has its own
+# subdirectory, so multiple courses can share it
+CACHE_DIR = Path(".cache")
+# hashes of the student-files written in the last run, it is part of the output, so it is
+# removed together with the student-files
+OUT_FILE_STUDENT_HASHES = OUT_DIR / "student_hashes.json"
+EXPORT_WORKERS = 8 # number of threads writing the student-files
+# wether to additionally write the points, maxima and results into a binary numpy-file,
+# which can be loaded again with `dct_load_columnar` without parsing any csv
+# (not in the streaming-mode, which never holds the complete points)
+OUTPUT_COLUMNAR = False
+OUT_FILE_COLUMNAR = OUT_DIR / "results.npz" # output-file for the columnar output
+# names of the arrays of the identifier of the students in the columnar output
+TPL_S_COLUMNAR_STUDENTS = ("matr_nr", "name", "vorname")
+OUT_FILE_VALIDATION = OUT_DIR / "validation.json" # output-file for the validation report
 
 I_MAT_NUM = "Matr-Nr" # column-name of the matricel number
 S_FORE_NAME = "vorname" # column-name of the forename
 S_SIRE_NAME = "name" # column-name of the sire-name
 
 TRES_PASSED = 0.5 # average treshold with which the student passed the test
+# how the overall fraction of a student is calculated, see `scoring.TPL_S_SCHEMES`
+SCORING_SCHEME = "task_mean"
+# weight of every homework (in the order of the files) for the scheme "homework_mean",
+# None for equal weights
+HOMEWORK_WEIGHTS = None
 
 # regex to check for column-names of the tasks
 RE_NUMBERS = re.compile(r"^(?P<identifier>A)(?P<number>\d+)$")
 
-class DuplicateMatrNrException(Exception):
+# options of `configure` and the constants they set
+DCT_CONFIG_CONSTANTS = {
+    "csv_dir": "CSV_DIR",
+    "out_dir": "OUT_DIR",
+    "delimiter": "DELIMITER",
+    "quote_char": "QUOTE_CHAR",
+    "output_student_names": "OUTPUT_STUDENT_NAMES",
+    "streaming": "STREAMING",
+    "streaming_chunk_rows": "STREAMING_CHUNK_ROWS",
+    "load_workers": "LOAD_WORKERS",
+    "incremental": "INCREMENTAL",
+    "cache_dir": "CACHE_DIR",
+    "export_workers": "EXPORT_WORKERS",
+    "output_columnar": "OUTPUT_COLUMNAR",
+    "mat_num_column": "I_MAT_NUM",
+    "fore_name_column": "S_FORE_NAME",
+    "sire_name_column": "S_SIRE_NAME",
+    "tres_passed": "TRES_PASSED",
+    "scoring_scheme": "SCORING_SCHEME",
+    "homework_weights": "HOMEWORK_WEIGHTS"
+}
+
+class DuplicateMatrNrException(ValueError):
     """_summary_ Exception where the same matricle-number appears multiple times
-    in the same dataframe
+    in the same dataframe or with different names
+    """
+
+class MalformedTaskColumnException(Exception):
+    """_summary_ Exception where a column of a homework is neither an identifier of the
+    students nor a task matching `RE_NUMBERS`
     """
 
 def main():
     """_summary_ main function
     """
-    # delete the output directory and its contents
-    if OUT_DIR.exists():
+    # delete the output directory and its contents, unless only the changes are written
+    if (STREAMING or not INCREMENTAL) and OUT_DIR.exists():
         shutil.rmtree(OUT_DIR)
 
-    dct_dataframes_from_csv = {}
-
     # create the output directory
     OUT_DIR_STUDENTS.mkdir(exist_ok=True, parents=True)
     OUT_FILE_RESULTS.parent.mkdir(exist_ok=True, parents=True)
 
-    # read the individual csv files into dataframes and store them into a list
-    for ff in CSV_DIR.rglob("*.csv"):
-        dct_dataframes_from_csv[ff] = df_load_csv(ff)
+    # sort the csv files, so every file gets the same homework-number on every run
+    lst_csv_paths = lst_find_csv_files(CSV_DIR)
+
+    # process the csv-files chunk by chunk instead of loading them completely
+    if STREAMING:
+        with instrumentation.stage("stream"):
+            stream_grade(lst_csv_paths)
+
+        return
+
+    with instrumentation.stage("load") as dct_stage:
+        if INCREMENTAL:
+            # read the individual csv files into dataframes, unchanged files come from the cache
+            dct_dataframes_from_csv, dct_max_points_from_csv = tpl_load_csv_files_cached(
+                lst_csv_paths, LOAD_WORKERS, pth_course_cache_dir()
+            )
+        else:
+            # read the individual csv files into dataframes
+            dct_dataframes_from_csv = dct_load_csv_files(lst_csv_paths, LOAD_WORKERS)
 
-    # combine the individual dataframes into a single big one
-    df_master = df_merge_dataframes_from_list(list(dct_dataframes_from_csv.values()))
+        dct_stage["rows"] = sum(len(dd) for dd in dct_dataframes_from_csv.values())
+
+    # check all the files before merging them, the problems are written into a report
+    with instrumentation.stage("validate"):
+        validate_dataframes(dct_dataframes_from_csv)
+
+    # combine the individual dataframes into a single sparse gradebook
+    with instrumentation.stage("merge") as dct_stage:
+        gb_master = gb_merge_dataframes_from_list(
+            list(dct_dataframes_from_csv.values()), list(dct_dataframes_from_csv)
+        )
+
+        dct_stage["rows"] = len(gb_master.idx_students)
 
     # find the maximum points for every task
-    df_max_points = df_find_max_points_per_task(df_master)
+    with instrumentation.stage("max_points"):
+        if INCREMENTAL:
+            # combine the cached maxima of the individual files
+            df_max_points = sr_merge_max_points_from_list(list(dct_max_points_from_csv.values()))
+        else:
+            df_max_points = gb_master.sr_max_points()
+
+    with instrumentation.stage("export_students", len(gb_master.idx_students)):
+        # hashes of the student-files of the last run, to skip the unchanged ones
+        dct_old_hashes = dct_load_student_hashes() if INCREMENTAL else {}
+
+        # output the points of the individual studens
+        dct_hashes = dct_export_student_rows(gb_master, dct_old_hashes)
+
+        # remove the files of students, which aren't in the data anymore
+        for ss in set(dct_old_hashes) - set(dct_hashes):
+            (OUT_DIR_STUDENTS / ss).with_suffix(".csv").unlink(missing_ok=True)
 
-    # output the points of the individual studens
-    for ii, dd in df_master.iterrows():
-        export_student_row(dd, ii)
+        # also after a full run, so the next incremental run compares with the current files
+        store_student_hashes(dct_hashes)
 
     # output the percentage-results of all the students
-    export_students_percent(df_master, df_max_points)
+    with instrumentation.stage("export_percent", len(gb_master.idx_students)):
+        export_students_percent(gb_master, df_max_points)
+
+    if OUTPUT_COLUMNAR:
+        with instrumentation.stage("export_columnar", len(gb_master.idx_students)):
+            export_columnar(gb_master, df_max_points)
+
+def dct_get_config() -> dict:
+    """_summary_ current configuration, e.g. to restore it after `configure`
+
+    Returns:
+        dict: _description_ value of every option of `configure`
+    """
+    return {kk: globals()[vv] for kk, vv in DCT_CONFIG_CONSTANTS.items()}
+
+def configure(**kwargs):
+    """_summary_ change the configuration (the constants of this module) for the next runs,
+    the paths derived from the directories are updated as well
+
+    Args:
+        **kwargs: _description_ new values of the options in `DCT_CONFIG_CONSTANTS`
+
+    Raises:
+        ValueError: if an option is unknown
+    """
+    global OUT_DIR_STUDENTS, OUT_FILE_RESULTS, OUT_FILE_COLUMNAR, OUT_FILE_VALIDATION
+    global OUT_FILE_STUDENT_HASHES
+
+    lst_unknown = sorted(set(kwargs) - set(DCT_CONFIG_CONSTANTS))
+
+    if lst_unknown:
+        raise ValueError(f"unknown options {lst_unknown}, expected some of {list(DCT_CONFIG_CONSTANTS)}")
+
+    for kk, vv in kwargs.items():
+        if kk in ("csv_dir", "out_dir", "cache_dir"):
+            vv = Path(vv)
+
+        globals()[DCT_CONFIG_CONSTANTS[kk]] = vv
+
+    OUT_DIR_STUDENTS = OUT_DIR / "students"
+    OUT_FILE_RESULTS = OUT_DIR / "results.csv"
+    OUT_FILE_COLUMNAR = OUT_DIR / "results.npz"
+    OUT_FILE_VALIDATION = OUT_DIR / "validation.json"
+    OUT_FILE_STUDENT_HASHES = OUT_DIR / "student_hashes.json"
+
+def lst_find_csv_files(csv_dir: Path) -> list[Path]:
+    """_summary_ find all the csv files in a directory and its subdirectories
+
+    Args:
+        csv_dir (Path): _description_ directory with the csv files
+
+    Returns:
+        list[Path]: _description_ paths of the csv files, sorted by their path
+    """
+    return sorted(csv_dir.rglob("*.csv"))
+
+def dct_load_csv_files(lst_csv_paths: list[Path], i_workers: int | None = None) -> dict[Path, pd.DataFrame]:
+    """_summary_ load multiple csv files in parallel
+
+    Args:
+        lst_csv_paths (list[Path]): _description_ paths of the csv files
+        i_workers (int | None, optional): _description_ number of worker-processes,
+        None for the number of cpus. Defaults to None.
+
+    Returns:
+        dict[Path, pd.DataFrame]: _description_ dataframe of every csv file, in the order of
+        the paths (independent of which file finished parsing first)
+    """
+    # the options are passed along, the worker-processes don't know the current configuration
+    dct_options = dct_csv_options()
+
+    if len(lst_csv_paths) <= 1 or (i_workers == 1 and LOAD_EXECUTOR is None):
+        return {ff: df_load_csv(ff, dct_options) for ff in lst_csv_paths}
+
+    # map returns the results in the order of the paths
+    if LOAD_EXECUTOR is not None:
+        return dict(zip(lst_csv_paths, LOAD_EXECUTOR.map(df_load_csv, lst_csv_paths, itertools.repeat(dct_options))))
+
+    with ProcessPoolExecutor(max_workers=i_workers) as executor:
+        return dict(zip(lst_csv_paths, executor.map(df_load_csv, lst_csv_paths, itertools.repeat(dct_options))))
+
+def s_hash_file(pth_file: Path) -> str:
+    """_summary_ calculate the hash of the content of a file
+
+    Args:
+        pth_file (Path): _description_ path of the file
+
+    Returns:
+        str: _description_ sha256-hash of the file as hex-string
+    """
+    hash_file = hashlib.sha256()
+
+    with open(pth_file, "rb") as file:
+        for bb in iter(lambda: file.read(1 << 20), b""):
+            hash_file.update(bb)
+
+    return hash_file.hexdigest()
+
+def pth_course_cache_dir() -> Path:
+    """_summary_ directory of the cached csv-files of the current csv-directory
+
+    Returns:
+        Path: _description_ subdirectory of `CACHE_DIR` named after the hash of the absolute
+        path of `CSV_DIR`
+    """
+    s_key = hashlib.sha256(str(CSV_DIR.resolve()).encode("utf-8")).hexdigest()[:16]
+
+    return CACHE_DIR / s_key
 
-def df_load_csv(csv_path: Path) -> pd.DataFrame:
+def pth_cache_entry(pth_cache_dir: Path, s_file_hash: str, dct_options: dict) -> Path:
+    """_summary_ path of the cached parse of a csv-file
+
+    Args:
+        pth_cache_dir (Path): _description_ directory of the cache
+        s_file_hash (str): _description_ hash of the content of the csv-file, see `s_hash_file`
+        dct_options (dict): _description_ options of the parser, see `dct_csv_options`
+
+    Returns:
+        Path: _description_ path of the entry, the same content parsed with other options
+        has another entry
+    """
+    s_key = hashlib.sha256(
+        (s_file_hash + json.dumps(dct_options, sort_keys=True)).encode("utf-8")
+    ).hexdigest()
+
+    return (pth_cache_dir / s_key).with_suffix(".pkl")
+
+def tpl_load_csv_files_cached(
+        lst_csv_paths: list[Path],
+        i_workers: int | None,
+        pth_cache_dir: Path
+    ) -> tuple[dict[Path, pd.DataFrame], dict[Path, pd.Series]]:
+    """_summary_ load multiple csv files, files with a content already parsed in an earlier
+    run are loaded from the cache, the others are parsed and added to the cache
+
+    Args:
+        lst_csv_paths (list[Path]): _description_ paths of the csv files
+        i_workers (int | None): _description_ number of worker-processes for the parsing
+        pth_cache_dir (Path): _description_ directory of the cache
+
+    Returns:
+        tuple[dict[Path, pd.DataFrame], dict[Path, pd.Series]]: _description_ dataframe and
+        maximum points of every task of every csv file, in the order of the paths
+    """
+    pth_cache_dir.mkdir(parents=True, exist_ok=True)
+
+    dct_options = dct_csv_options()
+
+    # the cache-entries are named after the hash of the content of the csv file and the options
+    dct_cache_files = {
+        ff: pth_cache_entry(pth_cache_dir, s_hash_file(ff), dct_options) for ff in lst_csv_paths
+    }
+
+    # parse only the files without a cache-entry
+    lst_new_paths = [ff for ff, cc in dct_cache_files.items() if not cc.exists()]
+
+    for ff, dd in dct_load_csv_files(lst_new_paths, i_workers).items():
+        pd.to_pickle({"data": dd, "max_points": df_find_max_points_per_task(dd)}, dct_cache_files[ff])
+
+    # remove the entries of files, which don't exist anymore
+    set_used = set(dct_cache_files.values())
+
+    for cc in pth_cache_dir.glob("*.pkl"):
+        if cc not in set_used:
+            cc.unlink()
+
+    dct_dataframes = {}
+    dct_max_points = {}
+
+    for ff, cc in dct_cache_files.items():
+        dct_cache = pd.read_pickle(cc)
+
+        dct_dataframes[ff] = dct_cache["data"]
+        dct_max_points[ff] = dct_cache["max_points"]
+
+    return dct_dataframes, dct_max_points
+
+def dct_csv_options() -> dict:
+    """_summary_ options of `pd.read_csv` for the homework-files from the current configuration
+
+    Returns:
+        dict: _description_ keyword-arguments of `pd.read_csv`
+    """
+    # index_col: column-names to be used to identify the individual rows
+    return {
+        "delimiter": DELIMITER,
+        "quotechar": QUOTE_CHAR,
+        "index_col": [I_MAT_NUM, S_SIRE_NAME, S_FORE_NAME]
+    }
+
+def df_load_csv(csv_path: Path, dct_options: dict | None = None) -> pd.DataFrame:
     """_summary_ load a csv file into a dictionary
 
     Args:
         csv_path (Path): _description_ path to the csv file
+        dct_options (dict | None, optional): _description_ options of `pd.read_csv`,
+        None for `dct_csv_options`. Defaults to None.
 
     Returns:
         pd.DataFrame: _description_ dataframe with the contents of the csv file
     """
+    return pd.read_csv(filepath_or_buffer=csv_path, **(dct_options or dct_csv_options()))
 
-    # index_col: column-names to be used to identify the individual rows
-    return pd.read_csv(
+def iter_load_csv_chunks(csv_path: Path):
+    """_summary_ load a csv file chunk by chunk
+
+    Args:
+        csv_path (Path): _description_ path to the csv file
+
+    Yields:
+        pd.DataFrame: _description_ dataframe with the next rows of the csv file
+    """
+    with pd.read_csv(
         filepath_or_buffer=csv_path,
-        delimiter=DELIMITER,
-        quotechar=QUOTE_CHAR,
-        index_col=[I_MAT_NUM, S_SIRE_NAME, S_FORE_NAME]
+        chunksize=STREAMING_CHUNK_ROWS,
+        **dct_csv_options()
+    ) as reader:
+        yield from reader
+
+def stream_grade(lst_csv_paths: list[Path]):
+    """_summary_ create the outputs by reading the csv files twice chunk by chunk:
+    the first pass finds the maximum points of every task and checks the matricle-numbers,
+    the second pass writes the points of the students and sums up their points
+
+    only the maxima and the sums of every student are kept in memory
+
+    Args:
+        lst_csv_paths (list[Path]): _description_ paths of the csv files in homework-order
+
+    Raises:
+        DuplicateMatrNrException: if the same matricle-number appears with different names
+        or multiple times in the same homework
+    """
+    # maximum points and homework of every task
+    dct_max_points = {}
+    dct_task_homework = {}
+
+    # names of every student by the matricle-number, to find duplicates
+    dct_names = {}
+    set_duplicates = set()
+
+    # code of every student, in the order of their first appearance
+    dct_student_codes = {}
+
+    for i_homework, ff in enumerate(lst_csv_paths, 1):
+        # matricle-numbers of the current homework
+        set_homework = set()
+
+        for dd in iter_load_csv_chunks(ff):
+            dd = dd.rename(columns=dct_create_rename_map(dd.columns, i_homework))
+
+            # combine the maxima of the chunk with the ones so far
+            for ss, f_max in dd.max().items():
+                dct_max_points[ss] = np.fmax(dct_max_points.get(ss, np.nan), f_max)
+                dct_task_homework.setdefault(ss, i_homework - 1)
+
+            for tt in dd.index:
+                if tt[0] in set_homework or dct_names.setdefault(tt[0], tt[1:]) != tt[1:]:
+                    set_duplicates.add(tt[0])
+
+                set_homework.add(tt[0])
+                dct_student_codes.setdefault(tt, len(dct_student_codes))
+
+    # if there are any duplicates, raise an exception
+    if len(set_duplicates) > 0:
+        raise DuplicateMatrNrException(
+            "The same matricle number appears mutiple times with a different name"
+            f"({sorted(set_duplicates)})"
+        )
+
+    # code of every task
+    dct_task_codes = {ss: ii for ii, ss in enumerate(dct_max_points)}
+
+    # running sums of the points of every student, the sums of the homeworks only if the
+    # scheme needs them
+    sa_scores = ScoreAccumulator(
+        len(dct_student_codes),
+        np.array(list(dct_max_points.values()), dtype=float),
+        np.array(list(dct_task_homework.values()), dtype=np.intp),
+        SCORING_SCHEME == "homework_mean"
     )
 
-def df_merge_dataframes_from_list(lst_datafarmes: list[pd.DataFrame]) -> pd.DataFrame:
-    """_summary_ combine a list full of dataframes into a single big one
+    # students with an already created file
+    set_written = set()
+
+    for i_homework, ff in enumerate(lst_csv_paths, 1):
+        for dd in iter_load_csv_chunks(ff):
+            dd = dd.rename(columns=dct_create_rename_map(dd.columns, i_homework))
+
+            # output the points of the chunk, appended to the files of the students
+            for tt, sr_points in dd.iterrows():
+                append_student_row(sr_points.dropna(), tt, tt not in set_written)
+
+                set_written.add(tt)
+
+            # add the attended tasks of the chunk to the sums
+            np_chunk = dd.to_numpy(dtype=np.float64)
+            np_rows, np_columns = np.nonzero(~np.isnan(np_chunk))
+
+            sa_scores.add(
+                np.array([dct_student_codes[tt] for tt in dd.index], dtype=np.intp)[np_rows],
+                np.array([dct_task_codes[ss] for ss in dd.columns], dtype=np.intp)[np_columns],
+                np_chunk[np_rows, np_columns]
+            )
+
+    # calculate the fraction of every student, students without a single task have no fraction
+    sr_percentage_mean = pd.Series(
+        sa_scores.np_fractions(SCORING_SCHEME, HOMEWORK_WEIGHTS),
+        index=pd.MultiIndex.from_tuples(list(dct_student_codes), names=[I_MAT_NUM, S_SIRE_NAME, S_FORE_NAME]),
+        dtype=float
+    )
+
+    export_fraction(sr_percentage_mean)
+
+def append_student_row(sr_points: pd.Series, t_ident: tuple[int, str, str], b_new: bool):
+    """_summary_ append the points of a student from a single homework to its csv file,
+    the complete file is the same as the one from `export_student_row`
+
+    Args:
+        sr_points (pd.Series): _description_ points of the student, without NaN
+        t_ident (tuple[int, str, str]): _description_ identifier of the student
+        b_new (bool): _description_ wether the file has to be created with the header
+    """
+    # construct the path of the output file
+    out_file = (OUT_DIR_STUDENTS / str(t_ident[0])).with_suffix(".csv")
+
+    with open(out_file, "w" if b_new else "a", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, delimiter=DELIMITER, lineterminator=os.linesep)
+
+        if b_new:
+            # check wether the student names should be outputted or only the matricel number
+            writer.writerows([["", hh] for hh in (t_ident if OUTPUT_STUDENT_NAMES else t_ident[:1])])
+
+        # format the values the same way as `dct_export_student_rows`
+        writer.writerows(zip(
+            sr_points.index.astype(str),
+            sr_points.to_numpy(dtype=np.float64).astype(str)
+        ))
+
+def dct_validation_report(dct_dataframes: dict[Path, pd.DataFrame]) -> dict:
+    """_summary_ find the problems of the homeworks in a single pass over the indices and
+    column-names of all the files: matricle-numbers appearing multiple times in a file,
+    matricle-numbers with different names in different files and columns which aren't tasks
+
+    Args:
+        dct_dataframes (dict[Path, pd.DataFrame]): _description_ dataframe of every csv file
+
+    Returns:
+        dict: _description_ report with the number of files and students, wether the files are
+        valid and a list of the problems of every kind
+    """
+    lst_files = [str(ff) for ff in dct_dataframes]
+
+    # one row per student of every file, with the file as a code
+    df_index = pd.DataFrame({
+        "file": np.repeat(np.arange(len(lst_files)), [len(dd) for dd in dct_dataframes.values()]),
+        I_MAT_NUM: np.concatenate([dd.index.get_level_values(0) for dd in dct_dataframes.values()]),
+        S_SIRE_NAME: np.concatenate([dd.index.get_level_values(1) for dd in dct_dataframes.values()]),
+        S_FORE_NAME: np.concatenate([dd.index.get_level_values(2) for dd in dct_dataframes.values()])
+    }) if lst_files else pd.DataFrame(columns=["file", I_MAT_NUM, S_SIRE_NAME, S_FORE_NAME])
+
+    # matricle-numbers appearing multiple times in the same file
+    df_duplicates = df_index[df_index.duplicated(["file", I_MAT_NUM], keep=False)]
+
+    # matricle-numbers appearing with different names
+    df_names = df_index.drop_duplicates([I_MAT_NUM, S_SIRE_NAME, S_FORE_NAME])
+    df_conflicts = df_index[df_index[I_MAT_NUM].isin(
+        df_names.loc[df_names.duplicated(I_MAT_NUM, keep=False), I_MAT_NUM]
+    )]
+
+    lst_duplicates = [
+        {
+            "file": lst_files[i_file],
+            "matr_nr": str(i_matr_nr),
+            "names": dd[[S_SIRE_NAME, S_FORE_NAME]].values.tolist()
+        }
+        for (i_file, i_matr_nr), dd in df_duplicates.groupby(["file", I_MAT_NUM], sort=False)
+    ]
+
+    lst_conflicts = [
+        {
+            "matr_nr": str(i_matr_nr),
+            "names": dd[[S_SIRE_NAME, S_FORE_NAME]].drop_duplicates().values.tolist(),
+            "files": [lst_files[ii] for ii in dd["file"].unique()]
+        }
+        for i_matr_nr, dd in df_conflicts.groupby(I_MAT_NUM, sort=False)
+    ]
+
+    # columns which aren't tasks
+    lst_malformed = []
+
+    for ff, dd in zip(lst_files, dct_dataframes.values()):
+        np_malformed = ~dd.columns.astype(str).str.match(RE_NUMBERS.pattern)
+
+        if np_malformed.any():
+            lst_malformed.append({"file": ff, "columns": dd.columns[np_malformed].astype(str).tolist()})
+
+    return {
+        "files": len(lst_files),
+        "students": int(df_index[I_MAT_NUM].nunique()),
+        "valid": not (lst_duplicates or lst_conflicts or lst_malformed),
+        "duplicates_in_file": lst_duplicates,
+        "name_conflicts": lst_conflicts,
+        "malformed_columns": lst_malformed
+    }
+
+def validate_dataframes(dct_dataframes: dict[Path, pd.DataFrame]):
+    """_summary_ check the homeworks before merging them and write the validation report
+
+    Args:
+        dct_dataframes (dict[Path, pd.DataFrame]): _description_ dataframe of every csv file
+
+    Raises:
+        DuplicateMatrNrException: if a matricle-number appears multiple times in a file or
+        with different names
+        MalformedTaskColumnException: if a column isn't a task
+    """
+    dct_report = dct_validation_report(dct_dataframes)
+
+    OUT_FILE_VALIDATION.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(OUT_FILE_VALIDATION, "w", encoding="utf-8") as file:
+        json.dump(dct_report, file, indent=4, ensure_ascii=False)
+
+    if dct_report["duplicates_in_file"] or dct_report["name_conflicts"]:
+        raise DuplicateMatrNrException(
+            f"{len(dct_report['duplicates_in_file'])} matricle numbers appear multiple times in "
+            f"a homework and {len(dct_report['name_conflicts'])} with a different name, "
+            f"see {OUT_FILE_VALIDATION}"
+        )
+
+    if dct_report["malformed_columns"]:
+        raise MalformedTaskColumnException(
+            f"{len(dct_report['malformed_columns'])} homeworks have columns which aren't tasks, "
+            f"see {OUT_FILE_VALIDATION}"
+        )
+
+def gb_merge_dataframes_from_list(
+        lst_datafarmes: list[pd.DataFrame],
+        lst_files: list | None = None
+    ) -> SparseGradebook:
+    """_summary_ combine a list full of dataframes into a single sparse gradebook
 
     Args:
         lst_datafarmes (list[pd.DataFrame]): _description_ list of the individual dataframes
+        lst_files (list | None, optional): _description_ file of every dataframe for the
+        error-messages. Defaults to None for the number of the homework.
+
+    Raises:
+        DuplicateMatrNrException: if a student appears multiple times in a homework or
+        the same matricle-number appears with different names
 
     Returns:
-        pd.DataFrame: _description_ single master dataframe
+        SparseGradebook: _description_ single master gradebook
     """
+    if lst_files is None:
+        lst_files = [f"homework {ii}" for ii in range(1, len(lst_datafarmes) + 1)]
+
     # counter for the homework
     i_counter = 1
 
@@ -103,24 +649,29 @@ def df_merge_dataframes_from_list(lst_datafarmes: list[pd.DataFrame]) -> pd.Data
         # IMPORTANT: increase homework-number-counter
         i_counter += 1
 
-    # concat the individual renamed dataframes into a single one along the columns
-    try:
-        df_master = pd.concat(objs=lst_renamed_dataframes, axis="columns")
-    except pd.errors.InvalidIndexError as e:
-        print (
-            "invalid index, possibleindex duplicates in a single homework, please check manually"
+    # the students of a single homework have to be unique
+    lst_str_duplicates = [
+        f"{ff}: {', '.join(map(str, dd.index[dd.index.duplicated()].get_level_values(0).unique()))}"
+        for ff, dd in zip(lst_files, lst_datafarmes)
+        if dd.index.has_duplicates
+    ]
+
+    if lst_str_duplicates:
+        raise DuplicateMatrNrException(
+            f"matricle numbers appearing multiple times in a homework ({'; '.join(lst_str_duplicates)})"
         )
 
-        raise e
+    # combine the individual renamed dataframes into a single gradebook along the columns
+    gb_master = SparseGradebook(lst_renamed_dataframes)
 
     # check wether a matrical-number appears multiple times
-    sr_index_matr_nr = df_master.index.droplevel([1, 2])
+    sr_index_matr_nr = gb_master.idx_students.droplevel([1, 2])
 
     # create a boolean map, wether the index has a duplicate
     sr_index_matr_nr_duplicates = sr_index_matr_nr.duplicated(keep=False)
 
-    # extract the indexes from all the duplicates from the master-dataframe
-    lst_duplicates = list(df_master[sr_index_matr_nr_duplicates].index)
+    # extract the indexes from all the duplicates from the master-gradebook
+    lst_duplicates = list(gb_master.idx_students[sr_index_matr_nr_duplicates])
 
     # if there are any entries in the duplicate list, print them and then raise an exception
     if len(lst_duplicates) > 0:
@@ -133,8 +684,24 @@ def df_merge_dataframes_from_list(lst_datafarmes: list[pd.DataFrame]) -> pd.Data
             f"({lst_str_duplicats})"
         )
 
-    # return the master dataframe
-    return df_master
+    # return the master gradebook
+    return gb_master
+
+def sr_merge_max_points_from_list(lst_max_points: list[pd.Series]) -> pd.Series:
+    """_summary_ combine the maximum points of the individual homeworks with the same
+    task-names as `gb_merge_dataframes_from_list`
+
+    Args:
+        lst_max_points (list[pd.Series]): _description_ maximum points of every task of
+        the individual homeworks
+
+    Returns:
+        pd.Series: _description_ maximum points of every task of all the homeworks
+    """
+    return pd.concat([
+        ss.rename(index=dct_create_rename_map(ss.index, ii))
+        for ii, ss in enumerate(lst_max_points, 1)
+    ]).astype(float)
 
 def dct_create_rename_map(lst_column_names: list[str], i_identifier) -> dict[str, str]:
     """_summary_ create a rename map for the column names so we can distinguish the tasks from 
@@ -171,12 +738,40 @@ def df_find_max_points_per_task(df_points: pd.DataFrame) -> pd.DataFrame:
 
     return df_max_points
 
-def export_student_row(sr_points: pd.Series, t_ident: tuple[int, str, str]):
+def dct_load_student_hashes() -> dict[str, str]:
+    """_summary_ load the hashes of the student-files of the last run
+
+    Returns:
+        dict[str, str]: _description_ hash of the file of every matricle-number
+    """
+    if not OUT_FILE_STUDENT_HASHES.exists():
+        return {}
+
+    with open(OUT_FILE_STUDENT_HASHES, encoding="utf-8") as file:
+        return json.load(file)
+
+def store_student_hashes(dct_hashes: dict[str, str]):
+    """_summary_ store the hashes of the student-files of the current run
+
+    Args:
+        dct_hashes (dict[str, str]): _description_ hash of the file of every matricle-number
+    """
+    OUT_FILE_STUDENT_HASHES.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(OUT_FILE_STUDENT_HASHES, "w", encoding="utf-8") as file:
+        json.dump(dct_hashes, file)
+
+def export_student_row(sr_points: pd.Series, t_ident: tuple[int, str, str], s_old_hash: str | None = None) -> str:
     """_summary_ write a give student with its points into a csv file
 
     Args:
         df_points (pd.DataFrame): _description_ points of the student
         t_ident (tuple[int, str, str]): _description_ identifier of the student
+        s_old_hash (str | None, optional): _description_ hash of the file of the last run,
+        the file is only written if the hash changed. Defaults to None.
+
+    Returns:
+        str: _description_ hash of the content of the file
     """
     # construct the path of the output file
     out_file = (OUT_DIR_STUDENTS / str(t_ident[0])).with_suffix(".csv")
@@ -191,38 +786,215 @@ def export_student_row(sr_points: pd.Series, t_ident: tuple[int, str, str]):
     else:
         header = [t_ident[0]] # specify to only output the matricel number
 
-    # write the timeseries into a file
-    sr_points.to_csv(path_or_buf=out_file, sep=DELIMITER, header=header)
+    # format the timeseries as csv
+    s_csv = sr_points.to_csv(sep=DELIMITER, header=header)
+    s_hash = hashlib.sha256(s_csv.encode("utf-8")).hexdigest()
+
+    # write the file only if its content changed
+    if s_hash != s_old_hash or not out_file.exists():
+        with open(out_file, "w", encoding="utf-8", newline="") as file:
+            file.write(s_csv)
+
+    return s_hash
+
+def dct_export_student_rows(gb_points: SparseGradebook, dct_old_hashes: dict[str, str]) -> dict[str, str]:
+    """_summary_ write all the students with their points into csv files at once,
+    the files are the same as the ones from `export_student_row`
 
-def export_students_percent(df_points: pd.DataFrame, sr_max_points: pd.Series):
+    Args:
+        gb_points (SparseGradebook): _description_ gradebook with all the points
+        from every student at every task
+        dct_old_hashes (dict[str, str]): _description_ hashes of the files of the last run,
+        only files with a different hash are written
+
+    Returns:
+        dict[str, str]: _description_ hash of the file of every matricle-number
+    """
+    # format the values once, the same way pandas does
+    np_tasks = gb_points.idx_tasks.astype(str).to_numpy()[gb_points.np_task_codes]
+    np_values = gb_points.np_points.astype(str)
+
+    # range of the entries of every student
+    np_bounds = gb_points.np_indptr
+
+    dct_hashes = {}
+    lst_writes = []
+
+    for ii, tt in enumerate(gb_points.idx_students):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=DELIMITER, lineterminator=os.linesep)
+
+        # check wether the student names should be outputted or only the matricel number
+        writer.writerows([["", hh] for hh in (tt if OUTPUT_STUDENT_NAMES else tt[:1])])
+        writer.writerows(zip(
+            np_tasks[np_bounds[ii]:np_bounds[ii + 1]],
+            np_values[np_bounds[ii]:np_bounds[ii + 1]]
+        ))
+
+        s_csv = buffer.getvalue()
+        s_hash = hashlib.sha256(s_csv.encode("utf-8")).hexdigest()
+
+        # construct the path of the output file
+        out_file = (OUT_DIR_STUDENTS / str(tt[0])).with_suffix(".csv")
+
+        # write the file only if its content changed
+        if s_hash != dct_old_hashes.get(str(tt[0])) or not out_file.exists():
+            lst_writes.append((out_file, s_csv))
+
+        dct_hashes[str(tt[0])] = s_hash
+
+    # write the files in parallel, the threads mostly wait for the file-system
+    with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as executor:
+        for _ in executor.map(lambda tpl: write_text_file(*tpl), lst_writes):
+            pass
+
+    return dct_hashes
+
+def write_text_file(pth_file: Path, s_content: str):
+    """_summary_ write a string into a file
+
+    Args:
+        pth_file (Path): _description_ path of the file
+        s_content (str): _description_ content of the file
+    """
+    with open(pth_file, "w", encoding="utf-8", newline="") as file:
+        file.write(s_content)
+
+def export_students_percent(gb_points: SparseGradebook, sr_max_points: pd.Series):
     """_summary_ export the points-fraction for every task into a csv-file
 
     Args:
-        df_points (pd.DataFrame): _description_ dataframe with all the points
+        gb_points (SparseGradebook): _description_ gradebook with all the points
         from every student at every task
         sr_max_points (pd.Series): _description_ series with the maximum
         achieved points at every task
     """
-    # calculate the percentage of every task of every student
-    fd_percentage = df_points / sr_max_points
+    # calculate the fraction of every student
+    sr_percentage_mean = pd.Series(
+        sa_score_gradebook(gb_points, sr_max_points).np_fractions(SCORING_SCHEME, HOMEWORK_WEIGHTS),
+        index=gb_points.idx_students
+    )
+
+    export_fraction(sr_percentage_mean)
 
-    # calculate the mean of every task
-    sr_percentage_mean = fd_percentage.mean(axis="columns")
+def sa_score_gradebook(gb_points: SparseGradebook, sr_max_points: pd.Series) -> ScoreAccumulator:
+    """_summary_ sum up the points of all the students of a gradebook
+
+    Args:
+        gb_points (SparseGradebook): _description_ gradebook with all the points
+        from every student at every task
+        sr_max_points (pd.Series): _description_ series with the maximum
+        achieved points at every task
+
+    Returns:
+        ScoreAccumulator: _description_ sums of the points of every student
+    """
+    sa_scores = ScoreAccumulator(
+        len(gb_points.idx_students),
+        sr_max_points[gb_points.idx_tasks].to_numpy(dtype=np.float64),
+        gb_points.np_task_homework
+    )
+
+    sa_scores.add(gb_points.np_student_codes(), gb_points.np_task_codes, gb_points.np_points)
+
+    return sa_scores
+
+def export_fraction(sr_percentage_mean: pd.Series):
+    """_summary_ export the mean points-fraction of every student into a csv-file
+
+    Args:
+        sr_percentage_mean (pd.Series): _description_ mean fraction of every student
+    """
+    idx_students = sr_percentage_mean.index
 
     # check wether the student names should be written or not
     if not OUTPUT_STUDENT_NAMES:
         # if no student names are requested, drop them form the index
-        sr_percentage_mean.index = sr_percentage_mean.index.droplevel([1, 2])
+        idx_students = idx_students.droplevel([1, 2])
 
     # check for every student, wether they passed the treshold
-    sr_passed = pd.Series(index=sr_percentage_mean.index, dtype=bool)
-    sr_passed.values[:] = True
-    sr_passed.where(sr_percentage_mean >= TRES_PASSED, False, inplace=True)
+    df_out = pd.DataFrame({
+        "fraction": sr_percentage_mean.to_numpy(),
+        "passed": np_passed(sr_percentage_mean.to_numpy(), TRES_PASSED)
+    }, index=idx_students)
 
     # write the points into a file, set the header accordingly
-    df_out = pd.concat([sr_percentage_mean, sr_passed], axis=1)
 
     df_out.to_csv(path_or_buf=OUT_FILE_RESULTS, sep=DELIMITER, header=["fraction", "passed"])
 
+def export_columnar(gb_points: SparseGradebook, sr_max_points: pd.Series):
+    """_summary_ export the points, the maximum points and the results into a single
+    numpy-file with one typed array per column, the points are stored in the
+    compressed-sparse-row layout of the gradebook
+
+    Args:
+        gb_points (SparseGradebook): _description_ gradebook with all the points
+        from every student at every task
+        sr_max_points (pd.Series): _description_ series with the maximum
+        achieved points at every task
+    """
+    sa_scores = sa_score_gradebook(gb_points, sr_max_points)
+
+    # fraction of every student, the same as in `export_students_percent`
+    np_fraction = sa_scores.np_fractions(SCORING_SCHEME, HOMEWORK_WEIGHTS)
+
+    dct_students = {}
+
+    for ii, ss in enumerate(TPL_S_COLUMNAR_STUDENTS):
+        np_level = gb_points.idx_students.get_level_values(ii).to_numpy()
+
+        # text (or mixed) identifiers would need pickle
+        dct_students[ss] = np_level.astype(str) if np_level.dtype == object else np_level
+
+    np.savez(
+        OUT_FILE_COLUMNAR,
+        **dct_students,
+        tasks=gb_points.idx_tasks.to_numpy(dtype=str),
+        task_homework=gb_points.np_task_homework,
+        indptr=gb_points.np_indptr,
+        task_codes=gb_points.np_task_codes,
+        points=gb_points.np_points,
+        max_points=sa_scores.np_max_points,
+        homework_fraction=sa_scores.np_homework_fractions(),
+        fraction=np_fraction,
+        passed=np_passed(np_fraction, TRES_PASSED)
+    )
+
+def dct_load_columnar(pth_file: Path | None = None) -> dict:
+    """_summary_ load the output of `export_columnar`
+
+    Args:
+        pth_file (Path | None, optional): _description_ path of the file. Defaults to None for
+        the columnar output of the current `OUT_DIR`.
+
+    Returns:
+        dict: _description_ arrays by their column-name: "matr_nr", "name", "vorname"
+        (one entry per student), "tasks", "max_points" (one entry per task),
+        "homework_fraction" (students x homeworks, NaN for homeworks which weren't attended),
+        "fraction" and "passed" (one entry per student), and the points as
+        `SparseGradebook` in "gradebook"
+    """
+    if pth_file is None:
+        pth_file = OUT_FILE_COLUMNAR
+
+    with np.load(pth_file, allow_pickle=False) as npz_file:
+        dct_columns = {kk: npz_file[kk] for kk in npz_file.files}
+
+    idx_students = pd.MultiIndex.from_arrays(
+        [dct_columns[ss] for ss in TPL_S_COLUMNAR_STUDENTS],
+        names=[I_MAT_NUM, S_SIRE_NAME, S_FORE_NAME]
+    )
+
+    dct_columns["gradebook"] = SparseGradebook.from_arrays(
+        idx_students,
+        pd.Index(dct_columns["tasks"]),
+        dct_columns.pop("task_homework"),
+        dct_columns.pop("indptr"),
+        dct_columns.pop("task_codes"),
+        dct_columns.pop("points")
+    )
+
+    return dct_columns
+
 if __name__ == "__main__":
-    main()
+    instrumentation.run(main)
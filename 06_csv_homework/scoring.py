@@ -0,0 +1,217 @@
+"""vectorized scoring of the points: fractions of the tasks, the homeworks and overall,
+and wether the students passed
+"""
+import numpy as np
+
+# available schemes for the overall fraction of a student:
+#   "task_mean"     mean of the fractions of the attended tasks, every task has the same weight
+#   "homework_mean" (weighted) mean of the fractions of the attended homeworks, the fraction of
+#                   a homework are its points divided by its maximum points
+#   "points"        all the points divided by the maximum points of the attended tasks
+TPL_S_SCHEMES = ("task_mean", "homework_mean", "points")
+
+class ScoreAccumulator:
+    """_summary_ running sums of the points of every student, the points can be added all at
+    once (in-memory) or chunk by chunk (streaming) with the same results
+
+    the sums of the homeworks are only kept on request (for the scheme "homework_mean" and the
+    fractions of the homeworks), sparse with one entry per attended homework of a student
+    """
+    # maximum points of every task
+    np_max_points: np.ndarray
+    # homework of every task
+    np_task_homework: np.ndarray
+    # number of homeworks
+    i_homeworks: int
+    # sum and number of the fractions of the attended tasks of every student
+    np_fraction_sum: np.ndarray
+    np_fraction_count: np.ndarray
+    # points and maximum points of the attended tasks of every student
+    np_points_sum: np.ndarray
+    np_max_sum: np.ndarray
+    # attended homeworks (student * i_homeworks + homework, ascending) with their points and
+    # maximum points, None if the homeworks aren't kept
+    np_homework_keys: np.ndarray | None
+    np_homework_points: np.ndarray | None
+    np_homework_max: np.ndarray | None
+
+    def __init__(
+            self,
+            i_students: int,
+            np_max_points: np.ndarray,
+            np_task_homework: np.ndarray,
+            b_homeworks: bool = True
+        ):
+        """_summary_ initializing function
+
+        Args:
+            i_students (int): _description_ number of students
+            np_max_points (np.ndarray): _description_ maximum points of every task
+            np_task_homework (np.ndarray): _description_ homework (starting at 0) of every task
+            b_homeworks (bool, optional): _description_ wether to keep the sums of every
+            homework. Defaults to True.
+        """
+        self.np_max_points = np.asarray(np_max_points, dtype=np.float64)
+        self.np_task_homework = np.asarray(np_task_homework, dtype=np.intp)
+
+        self.i_homeworks = int(self.np_task_homework.max()) + 1 if len(self.np_task_homework) > 0 else 0
+
+        self.np_fraction_sum = np.zeros(i_students)
+        self.np_fraction_count = np.zeros(i_students, dtype=np.int64)
+        self.np_points_sum = np.zeros(i_students)
+        self.np_max_sum = np.zeros(i_students)
+
+        if b_homeworks:
+            self.np_homework_keys = np.empty(0, dtype=np.int64)
+            self.np_homework_points = np.empty(0)
+            self.np_homework_max = np.empty(0)
+        else:
+            self.np_homework_keys = self.np_homework_points = self.np_homework_max = None
+
+    def np_task_fractions(self, np_tasks: np.ndarray, np_points: np.ndarray) -> np.ndarray:
+        """_summary_ fraction of the maximum points of single entries
+
+        Args:
+            np_tasks (np.ndarray): _description_ task of every entry
+            np_points (np.ndarray): _description_ points of every entry
+
+        Returns:
+            np.ndarray: _description_ fraction of every entry, NaN for tasks without any points
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np_points / self.np_max_points[np_tasks]
+
+    def add(self, np_rows: np.ndarray, np_tasks: np.ndarray, np_points: np.ndarray):
+        """_summary_ add the points of attended tasks
+
+        the entries are added one after another, so the sums are the same, no matter how the
+        points of a student are split into multiple calls
+
+        Args:
+            np_rows (np.ndarray): _description_ student of every entry
+            np_tasks (np.ndarray): _description_ task of every entry
+            np_points (np.ndarray): _description_ points of every entry, without NaN
+        """
+        np_points = np.asarray(np_points, dtype=np.float64)
+        np_max = self.np_max_points[np_tasks]
+        np_fractions = self.np_task_fractions(np_tasks, np_points)
+
+        # tasks without any points (0 / 0) are skipped like in the mean of pandas
+        np_valid = ~np.isnan(np_fractions)
+
+        np.add.at(self.np_fraction_sum, np_rows[np_valid], np_fractions[np_valid])
+        np.add.at(self.np_fraction_count, np_rows[np_valid], 1)
+
+        np.add.at(self.np_points_sum, np_rows, np_points)
+        np.add.at(self.np_max_sum, np_rows, np_max)
+
+        if self.np_homework_keys is None:
+            return
+
+        np_keys = np.asarray(np_rows, dtype=np.int64) * self.i_homeworks + self.np_task_homework[np_tasks]
+
+        # merge the entries into the attended homeworks so far, the old sums come first
+        self.np_homework_keys, np_inverse = np.unique(
+            np.concatenate((self.np_homework_keys, np_keys)), return_inverse=True
+        )
+
+        np_homework_points = np.zeros(len(self.np_homework_keys))
+        np_homework_max = np.zeros(len(self.np_homework_keys))
+
+        np.add.at(np_homework_points, np_inverse, np.concatenate((self.np_homework_points, np_points)))
+        np.add.at(np_homework_max, np_inverse, np.concatenate((self.np_homework_max, np_max)))
+
+        self.np_homework_points = np_homework_points
+        self.np_homework_max = np_homework_max
+
+    def tpl_np_homework_fractions(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """_summary_ fraction of the points of the attended homeworks of every student
+
+        Raises:
+            ValueError: if the sums of the homeworks aren't kept
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: _description_ student, homework and
+            fraction of every attended homework with any maximum points
+        """
+        if self.np_homework_keys is None:
+            raise ValueError("the sums of the homeworks aren't kept")
+
+        np_valid = self.np_homework_max > 0
+
+        np_students, np_homeworks = np.divmod(self.np_homework_keys[np_valid], max(self.i_homeworks, 1))
+
+        return (
+            np_students,
+            np_homeworks,
+            self.np_homework_points[np_valid] / self.np_homework_max[np_valid]
+        )
+
+    def np_homework_fractions(self) -> np.ndarray:
+        """_summary_ fraction of the points of every student at every homework
+
+        Returns:
+            np.ndarray: _description_ fraction with one row per student and one column per
+            homework, NaN for homeworks which weren't attended
+        """
+        np_students, np_homeworks, np_fractions = self.tpl_np_homework_fractions()
+
+        np_dense = np.full((len(self.np_fraction_sum), self.i_homeworks), np.nan)
+        np_dense[np_students, np_homeworks] = np_fractions
+
+        return np_dense
+
+    def np_fractions(self, s_scheme: str = "task_mean", np_homework_weights=None) -> np.ndarray:
+        """_summary_ overall fraction of every student
+
+        Args:
+            s_scheme (str, optional): _description_ scheme of the fraction, one of
+            `TPL_S_SCHEMES`. Defaults to "task_mean".
+            np_homework_weights (array-like, optional): _description_ weight of every homework
+            for the scheme "homework_mean", None for equal weights. Defaults to None.
+
+        Raises:
+            ValueError: if the scheme is unknown, or it is "homework_mean" and the sums of the
+            homeworks aren't kept
+
+        Returns:
+            np.ndarray: _description_ fraction of every student, NaN if the student
+            didn't attend any task
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if s_scheme == "task_mean":
+                return self.np_fraction_sum / self.np_fraction_count
+
+            if s_scheme == "points":
+                return self.np_points_sum / self.np_max_sum
+
+            if s_scheme == "homework_mean":
+                np_students, np_homeworks, np_fractions = self.tpl_np_homework_fractions()
+
+                if np_homework_weights is None:
+                    np_weights = np.ones(self.i_homeworks)
+                else:
+                    np_weights = np.asarray(np_homework_weights, dtype=np.float64)
+
+                # only the attended homeworks count
+                np_weights = np_weights[np_homeworks]
+
+                i_students = len(self.np_fraction_sum)
+
+                return np.bincount(np_students, np_fractions * np_weights, minlength=i_students) \
+                    / np.bincount(np_students, np_weights, minlength=i_students)
+
+        raise ValueError(f"unknown scoring-scheme {s_scheme!r}, expected one of {TPL_S_SCHEMES}")
+
+def np_passed(np_fractions: np.ndarray, f_threshold: float) -> np.ndarray:
+    """_summary_ check for every student, wether they passed the treshold
+
+    Args:
+        np_fractions (np.ndarray): _description_ overall fraction of every student
+        f_threshold (float): _description_ minimum fraction to pass
+
+    Returns:
+        np.ndarray: _description_ wether every student passed, students without a fraction
+        didn't pass
+    """
+    return np.nan_to_num(np_fractions, nan=-np.inf) >= f_threshold
@@ -0,0 +1,33 @@
+"""the modules of the homework are imported by their names, like in the scripts"""
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import create_test_files
+import main as grading
+
+@pytest.fixture
+def pth_course(tmp_path: Path) -> Path:
+    """course with random homeworks in "csv", graded into "output" with the cache in ".cache",
+    the configuration of `main` is restored afterwards
+    """
+    create_test_files.main([
+        "--students", "40", "--files", "4", "--seed", "0", "--out-dir", str(tmp_path / "csv")
+    ])
+
+    dct_defaults = grading.dct_get_config()
+
+    grading.configure(
+        csv_dir=tmp_path / "csv",
+        out_dir=tmp_path / "output",
+        cache_dir=tmp_path / ".cache",
+        load_workers=1,
+        export_workers=1
+    )
+
+    yield tmp_path
+
+    grading.configure(**dct_defaults)
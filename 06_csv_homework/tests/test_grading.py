@@ -0,0 +1,120 @@
+"""the modes of the grading give the same results as a complete run"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main as grading
+
+# files of the output, which don't depend on the mode
+TPL_S_COMPARED_SUFFIXES = (".csv",)
+
+def dct_read_output(pth_out_dir: Path) -> dict[str, bytes]:
+    """contents of the results and the student-files of an output-directory
+
+    Args:
+        pth_out_dir (Path): output-directory
+
+    Returns:
+        dict[str, bytes]: content of every file by its path relative to the directory
+    """
+    return {
+        pp.relative_to(pth_out_dir).as_posix(): pp.read_bytes()
+        for pp in sorted(pth_out_dir.rglob("*"))
+        if pp.suffix in TPL_S_COMPARED_SUFFIXES
+    }
+
+@pytest.mark.parametrize("b_names", [False, True])
+@pytest.mark.parametrize("s_scheme", ["task_mean", "homework_mean", "points"])
+def test_streaming_matches_in_memory(pth_course, b_names, s_scheme):
+    grading.configure(output_student_names=b_names, scoring_scheme=s_scheme)
+    grading.main()
+
+    dct_expected = dct_read_output(grading.OUT_DIR)
+
+    # small chunks, so the students of a homework are split over multiple chunks
+    grading.configure(streaming=True, streaming_chunk_rows=7)
+    grading.main()
+
+    assert dct_read_output(grading.OUT_DIR) == dct_expected
+    assert len(dct_expected) > 1
+
+def test_incremental_matches_full_run(pth_course):
+    grading.configure(incremental=True)
+    grading.main()
+
+    pth_csv_dir = pth_course / "csv"
+    lst_csv_paths = grading.lst_find_csv_files(pth_csv_dir)
+
+    # a new homework and a new maximum (with the same size) in an existing one
+    pth_added = pth_csv_dir / "homework_5.csv"
+    pth_added.write_bytes(lst_csv_paths[1].read_bytes())
+
+    lst_s_lines = lst_csv_paths[0].read_text(encoding="utf-8").splitlines(keepends=True)
+    lst_s_lines[1] = lst_s_lines[1][:-2] + "9\n"
+
+    lst_csv_paths[0].write_text("".join(lst_s_lines), encoding="utf-8")
+
+    grading.main()
+
+    dct_incremental = dct_read_output(grading.OUT_DIR)
+
+    grading.configure(incremental=False, out_dir=pth_course / "output_full")
+    grading.main()
+
+    assert dct_read_output(grading.OUT_DIR) == dct_incremental
+    assert f"students/{lst_s_lines[1].split(';')[2]}.csv" in dct_incremental
+
+@pytest.mark.parametrize("b_streaming", [False, True])
+def test_export_student_files(pth_course, b_streaming):
+    # two small homeworks instead of the random ones, a task without points is left out
+    pth_csv_dir = pth_course / "csv"
+
+    for pp in pth_csv_dir.glob("*.csv"):
+        pp.unlink()
+
+    (pth_csv_dir / "homework_1.csv").write_text(
+        "name;vorname;Matr-Nr;A1;A2\nDoe;Jane;111;1;2\nRoe;Rick;222;3;\n", encoding="utf-8"
+    )
+    (pth_csv_dir / "homework_2.csv").write_text(
+        "name;vorname;Matr-Nr;A1\nRoe;Rick;222;4\n", encoding="utf-8"
+    )
+
+    grading.configure(output_student_names=True, streaming=b_streaming)
+    grading.main()
+
+    assert sorted(pp.name for pp in grading.OUT_DIR_STUDENTS.iterdir()) == ["111.csv", "222.csv"]
+
+    assert (grading.OUT_DIR_STUDENTS / "111.csv").read_text(encoding="utf-8").splitlines() == \
+        [";111", ";Doe", ";Jane", "A1.1;1.0", "A1.2;2.0"]
+    assert (grading.OUT_DIR_STUDENTS / "222.csv").read_text(encoding="utf-8").splitlines() == \
+        [";222", ";Roe", ";Rick", "A1.1;3.0", "A2.1;4.0"]
+
+    # mean of the fractions of the attended tasks, the maxima are 3, 2 and 4
+    assert grading.OUT_FILE_RESULTS.read_text(encoding="utf-8").splitlines() == [
+        "Matr-Nr;name;vorname;fraction;passed",
+        f"111;Doe;Jane;{(1 / 3 + 1) / 2};True",
+        "222;Roe;Rick;1.0;True"
+    ]
+
+def test_columnar_round_trip(pth_course):
+    grading.configure(output_columnar=True)
+    grading.main()
+
+    dct_columnar = grading.dct_load_columnar()
+
+    dct_dataframes = grading.dct_load_csv_files(grading.lst_find_csv_files(grading.CSV_DIR), 1)
+    gb_expected = grading.gb_merge_dataframes_from_list(list(dct_dataframes.values()))
+
+    pd.testing.assert_frame_equal(dct_columnar["gradebook"].df_dense(), gb_expected.df_dense())
+    np.testing.assert_array_equal(dct_columnar["max_points"], gb_expected.sr_max_points().to_numpy())
+
+    # the same results as in the csv-file
+    df_results = pd.read_csv(grading.OUT_FILE_RESULTS, sep=grading.DELIMITER, float_precision="round_trip")
+
+    np.testing.assert_array_equal(dct_columnar["matr_nr"], df_results["Matr-Nr"].to_numpy())
+    np.testing.assert_array_equal(dct_columnar["fraction"], df_results["fraction"].to_numpy())
+    np.testing.assert_array_equal(dct_columnar["passed"], df_results["passed"].to_numpy())
+
+    assert dct_columnar["homework_fraction"].shape == (len(df_results), 4)
@@ -0,0 +1,266 @@
+"""registry of vectorized distance-metrics for the k-nearest-neighbor
+
+every metric ranks the neighbours by a "rank-distance", which has the same order as the
+real distance but may be cheaper to calculate (e.g. the squared euclidean distance without
+the square-root). The real distance is only calculated where it is needed.
+"""
+import abc
+import numpy as np
+
+class DistanceMetric(abc.ABC):
+    """base-class of the distance-metrics"""
+    # name of the metric in the registry
+    s_name: str = ""
+    # wether a lower bound can be calculated from the per-dimension gaps to a bounding-box
+    b_kdtree: bool = False
+    # wether the metric fulfills the triangle-inequality
+    b_balltree: bool = False
+
+    def dct_params(self) -> dict:
+        """parameters to recreate the metric with `metric_get`
+
+        Returns:
+            dict: parameters of the metric
+        """
+        return {}
+
+    @abc.abstractmethod
+    def np_rank_pairwise(self, np_queries: np.ndarray, np_points: np.ndarray) -> np.ndarray:
+        """rank-distances between all queries and all points
+
+        Args:
+            np_queries (np.ndarray): queries with one row per query
+            np_points (np.ndarray): points with one row per point
+
+        Returns:
+            np.ndarray: rank-distances with one row per query and one column per point
+        """
+
+    def np_rank_to_point(self, np_points: np.ndarray, np_point: np.ndarray) -> np.ndarray:
+        """rank-distances between multiple points and a single point
+
+        Args:
+            np_points (np.ndarray): points with one row per point
+            np_point (np.ndarray): single point
+
+        Returns:
+            np.ndarray: rank-distance of every point
+        """
+        return self.np_rank_pairwise(np_point[np.newaxis], np_points)[0]
+
+    def np_rank_to_distance(self, np_rank: np.ndarray) -> np.ndarray:
+        """convert rank-distances into real distances
+
+        Args:
+            np_rank (np.ndarray): rank-distances
+
+        Returns:
+            np.ndarray: real distances
+        """
+        return np_rank
+
+    def np_distance_to_rank(self, np_dist: np.ndarray) -> np.ndarray:
+        """convert real distances into rank-distances
+
+        Args:
+            np_dist (np.ndarray): real distances
+
+        Returns:
+            np.ndarray: rank-distances
+        """
+        return np_dist
+
+    def np_pairwise(self, np_queries: np.ndarray, np_points: np.ndarray) -> np.ndarray:
+        """real distances between all queries and all points
+
+        Args:
+            np_queries (np.ndarray): queries with one row per query
+            np_points (np.ndarray): points with one row per point
+
+        Returns:
+            np.ndarray: distances with one row per query and one column per point
+        """
+        return self.np_rank_to_distance(self.np_rank_pairwise(np_queries, np_points))
+
+class MinkowskiMetric(DistanceMetric):
+    """(weighted) minkowski-distance (sum(w * |a - b| ** p)) ** (1 / p),
+    ranked without the outer root
+    """
+    s_name = "minkowski"
+    b_kdtree = True
+
+    # exponent of the metric
+    f_p: float
+    # weight of every feature, None for equal weights
+    np_weights: np.ndarray | None
+
+    def __init__(self, p: float = 2, weights=None):
+        """initializing function
+
+        Args:
+            p (float, optional): exponent of the metric, at least 1. Defaults to 2.
+            weights (array-like, optional): non-negative weight of every feature.
+            Defaults to None.
+
+        Raises:
+            ValueError: if p is smaller than 1 or a weight is negative
+        """
+        if p < 1:
+            raise ValueError(f"the exponent of the minkowski-distance must be at least 1, not {p}")
+
+        self.f_p = float(p)
+        self.np_weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+
+        if self.np_weights is not None and (self.np_weights < 0).any():
+            raise ValueError("the weights of the minkowski-distance must not be negative")
+
+        self.b_balltree = True
+
+    def dct_params(self) -> dict:
+        return {"p": self.f_p, "weights": self._lst_weights()}
+
+    def _lst_weights(self) -> list[float] | None:
+        """weights as a list, so they can be stored
+
+        Returns:
+            list[float] | None: weight of every feature, None for equal weights
+        """
+        return None if self.np_weights is None else self.np_weights.tolist()
+
+    def np_rank_pairwise(self, np_queries: np.ndarray, np_points: np.ndarray) -> np.ndarray:
+        np_rank = np.zeros((len(np_queries), len(np_points)))
+
+        # sum up the columns one after another, this keeps the temporary arrays small
+        for ii in range(np_points.shape[1]):
+            np_diff = np_points[:, ii] - np_queries[:, ii, np.newaxis]
+
+            if self.f_p == 2:
+                np_term = np_diff ** 2
+            elif self.f_p == 1:
+                np_term = np.abs(np_diff)
+            else:
+                np_term = np.abs(np_diff) ** self.f_p
+
+            if self.np_weights is not None:
+                np_term *= self.np_weights[ii]
+
+            np_rank += np_term
+
+        return np_rank
+
+    def np_rank_to_distance(self, np_rank: np.ndarray) -> np.ndarray:
+        if self.f_p == 2:
+            return np.sqrt(np_rank)
+        elif self.f_p == 1:
+            return np_rank
+        else:
+            return np_rank ** (1 / self.f_p)
+
+    def np_distance_to_rank(self, np_dist: np.ndarray) -> np.ndarray:
+        if self.f_p == 1:
+            return np_dist
+        else:
+            return np_dist ** self.f_p
+
+class EuclideanMetric(MinkowskiMetric):
+    """euclidean distance, ranked by the squared distance"""
+    s_name = "euclidean"
+
+    def __init__(self, weights=None):
+        super().__init__(2, weights)
+
+    def dct_params(self) -> dict:
+        return {"weights": self._lst_weights()}
+
+class SquaredEuclideanMetric(MinkowskiMetric):
+    """squared euclidean distance, doesn't fulfill the triangle-inequality"""
+    s_name = "sqeuclidean"
+
+    def __init__(self, weights=None):
+        super().__init__(2, weights)
+
+        self.b_balltree = False
+
+    def dct_params(self) -> dict:
+        return {"weights": self._lst_weights()}
+
+    def np_rank_to_distance(self, np_rank: np.ndarray) -> np.ndarray:
+        return np_rank
+
+    def np_distance_to_rank(self, np_dist: np.ndarray) -> np.ndarray:
+        return np_dist
+
+class ManhattanMetric(MinkowskiMetric):
+    """manhattan- / city-block-distance"""
+    s_name = "manhattan"
+
+    def __init__(self, weights=None):
+        super().__init__(1, weights)
+
+    def dct_params(self) -> dict:
+        return {"weights": self._lst_weights()}
+
+class ChebyshevMetric(DistanceMetric):
+    """chebyshev-distance, the largest difference of all the features"""
+    s_name = "chebyshev"
+    b_kdtree = True
+    b_balltree = True
+
+    def np_rank_pairwise(self, np_queries: np.ndarray, np_points: np.ndarray) -> np.ndarray:
+        np_rank = np.zeros((len(np_queries), len(np_points)))
+
+        for ii in range(np_points.shape[1]):
+            np.maximum(np_rank, np.abs(np_points[:, ii] - np_queries[:, ii, np.newaxis]), out=np_rank)
+
+        return np_rank
+
+class CosineMetric(DistanceMetric):
+    """cosine-distance 1 - cos(angle), vectors with a length of 0 have a distance of 1"""
+    s_name = "cosine"
+
+    def np_rank_pairwise(self, np_queries: np.ndarray, np_points: np.ndarray) -> np.ndarray:
+        np_norm_queries = np.linalg.norm(np_queries, axis=1)
+        np_norm_points = np.linalg.norm(np_points, axis=1)
+
+        np_norms = np_norm_queries[:, np.newaxis] * np_norm_points
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            np_cos = (np_queries @ np_points.T) / np_norms
+
+        np_cos[np_norms == 0] = 0
+
+        return 1 - np_cos
+
+# all the available metrics by their name
+DCT_METRICS: dict[str, type[DistanceMetric]] = {
+    mm.s_name: mm for mm in (
+        EuclideanMetric,
+        SquaredEuclideanMetric,
+        ManhattanMetric,
+        ChebyshevMetric,
+        MinkowskiMetric,
+        CosineMetric
+    )
+}
+
+def metric_get(metric, dct_params: dict | None = None) -> DistanceMetric:
+    """look up a metric in the registry
+
+    Args:
+        metric (str | DistanceMetric): name of the metric or an already created metric
+        dct_params (dict | None, optional): parameters of the metric, e.g. "p" or "weights".
+        Defaults to None.
+
+    Raises:
+        ValueError: if the metric is unknown
+
+    Returns:
+        DistanceMetric: the metric
+    """
+    if isinstance(metric, DistanceMetric):
+        return metric
+
+    if metric not in DCT_METRICS:
+        raise ValueError(f"unknown metric {metric!r}, expected one of {tuple(DCT_METRICS)}")
+
+    return DCT_METRICS[metric](**(dct_params or {}))
@@ -0,0 +1,123 @@
+"""cross-validation of the k-nearest-neighbor over k and the distance-metric
+
+run it from this directory, e.g.
+    python evaluate.py --folds 10 --k 1 3 5 7 9 15 --metric euclidean manhattan cosine
+"""
+from pathlib import Path
+import argparse
+import functools
+
+import numpy as np
+import pandas as pd
+
+from distanceMetrics import DCT_METRICS
+from kNearestNeighbor import KNearestNeighbor
+
+# the main-module makes the shared modules of all the homeworks importable
+import main as knn_main
+import evaluation
+
+# default values of the hyperparameters
+LST_I_K = list(range(1, 31))
+LST_S_METRICS = ["euclidean", "manhattan", "chebyshev", "cosine"]
+
+def main(lst_args: list[str] | None = None):
+    args = parse_args(lst_args)
+
+    df_data = pd.read_csv(Path("iris_set.csv"), quotechar='"', delimiter=',')
+
+    np_class_codes, idx_class_labels = pd.factorize(df_data[knn_main.S_CLASS_COLUMN])
+    np_features = df_data[knn_main.LST_S_DISTANCE_COLUMNS].to_numpy(dtype=np.float64)
+
+    if args.repeats is None:
+        lst_tpl_folds = evaluation.lst_tpl_np_kfold(len(df_data), args.folds, args.seed)
+    else:
+        lst_tpl_folds = evaluation.lst_tpl_np_repeated_splits(
+            len(df_data), knn_main.F_FRAC, args.repeats, args.seed
+        )
+
+    # the metric changes slowest, so every task searches the neighbours as seldom as possible
+    lst_dct_params = evaluation.lst_dct_grid({"metric": args.metric, "k": args.k})
+
+    df_scores = evaluation.df_cross_validate(
+        functools.partial(np_scores_fold, np_features, np_class_codes, idx_class_labels),
+        lst_tpl_folds,
+        lst_dct_params,
+        args.workers,
+        args.grid_chunks
+    )
+
+    print(evaluation.df_summary(df_scores).to_string())
+
+def parse_args(lst_args: list[str] | None = None) -> argparse.Namespace:
+    """parse the command-line arguments
+
+    Args:
+        lst_args (list[str] | None, optional): arguments, None for the ones of the
+        command-line. Defaults to None.
+
+    Returns:
+        argparse.Namespace: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="cross-validate the k-nearest-neighbor")
+
+    parser.add_argument("--folds", type=int, default=5, help="number of folds of the k-fold split")
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="use this many random training- and test-splits instead of k folds")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the splits")
+    parser.add_argument("--k", type=int, nargs="+", default=LST_I_K, help="values of k to evaluate")
+    parser.add_argument("--metric", nargs="+", default=LST_S_METRICS, choices=list(DCT_METRICS),
+                        help="distance-metrics to evaluate")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, 1 to evaluate in this process")
+    parser.add_argument("--grid-chunks", type=int, default=1,
+                        help="number of tasks the grid is split into for every fold")
+
+    return parser.parse_args(lst_args)
+
+def np_scores_fold(
+        np_features: np.ndarray,
+        np_class_codes: np.ndarray,
+        idx_class_labels: pd.Index,
+        np_train: np.ndarray,
+        np_test: np.ndarray,
+        lst_dct_params: list[dict]
+    ) -> np.ndarray:
+    """accuracy of every parameter-set on a fold
+
+    the neighbours are searched once per metric up to the largest k, all the smaller k
+    vote from the same neighbour-list
+
+    Args:
+        np_features (np.ndarray): features of all the rows
+        np_class_codes (np.ndarray): class-code of all the rows
+        idx_class_labels (pd.Index): class-labels belonging to the codes
+        np_train (np.ndarray): positions of the training-rows
+        np_test (np.ndarray): positions of the test-rows
+        lst_dct_params (list[dict]): parameter-sets with "metric" and "k"
+
+    Returns:
+        np.ndarray: fraction of the correctly predicted test-rows for every parameter-set
+    """
+    np_scores = np.empty(len(lst_dct_params))
+
+    for s_metric in dict.fromkeys(dd["metric"] for dd in lst_dct_params):
+        lst_i_params = [ii for ii, dd in enumerate(lst_dct_params) if dd["metric"] == s_metric]
+        lst_i_k = [lst_dct_params[ii]["k"] for ii in lst_i_params]
+
+        kn_fold = KNearestNeighbor.from_arrays(
+            np_features[np_train],
+            np_class_codes[np_train],
+            idx_class_labels,
+            max(lst_i_k),
+            metric=s_metric
+        )
+
+        np_errors = kn_fold.np_sweep_errors(np_features[np_test], np_class_codes[np_test], lst_i_k)
+
+        np_scores[lst_i_params] = 1 - np_errors / len(np_test)
+
+    return np_scores
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,25 @@
-import math
+import json
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from distanceMetrics import DistanceMetric, metric_get
+from spatialIndex import KDTree, BallTree, SpatialTree
+
+# upper bound for the number of elements of a single query-to-train distance block
+I_BLOCK_ELEMENTS = 2 ** 22
+
+# available backends for the neighbour-search
+TPL_S_BACKENDS = ("auto", "brute", "kdtree", "balltree")
+# below this number of training-rows the vectorized brute-force search is faster than a tree
+I_AUTO_BRUTE_MAX_ROWS = 10000
+# maximum dimensions for which the automatic choice uses a kd-tree, resp. a ball-tree
+I_AUTO_KDTREE_MAX_DIMS = 10
+I_AUTO_BALLTREE_MAX_DIMS = 40
+
+# name of the file with the settings of a stored model, the arrays are stored next to it
+S_MODEL_FILE = "model.json"
+
 class KNearestNeighbor:
     """simple implementation of k-nearest-neighbor
 
@@ -12,35 +31,253 @@ class KNearestNeighbor:
     i_k: int
     s_class_column: str
 
-    def __init__(self, df_train_data, lst_s_distance_columns: list[str], i_k: int, s_class_column: str):
+    # training-data of the distance-columns as a contiguous float-array
+    np_data: np.ndarray
+    # class of every training-row as an integer-code
+    np_class_codes: np.ndarray
+    # class-labels belonging to the integer-codes
+    idx_class_labels: pd.Index
+
+    # metric of the distances
+    metric: DistanceMetric
+
+    # backend used for the neighbour-search
+    s_backend: str
+    # spatial index over the training-data, None for the brute-force search
+    tree: SpatialTree | None
+
+    def __init__(
+            self,
+            df_train_data,
+            lst_s_distance_columns: list[str],
+            i_k: int,
+            s_class_column: str,
+            backend: str = "auto",
+            metric: str | DistanceMetric = "euclidean",
+            dct_metric_params: dict | None = None
+        ):
         """_summary_
 
         Args:
             train_data (_type_): _description_
             distance_columns (list[str]): Name of columns for distance calculation
             k (int): the k-nearest neighbors
+            backend (str, optional): neighbour-search, one of "brute", "kdtree", "balltree"
+            or "auto" to choose by the size and dimensionality of the data. Defaults to "auto".
+            metric (str | DistanceMetric, optional): name of a metric in `DCT_METRICS` or a
+            metric-instance. Defaults to "euclidean".
+            dct_metric_params (dict | None, optional): parameters of the metric,
+            e.g. {"p": 3} or {"weights": [...]}. Defaults to None.
         """
         self.df_data = df_train_data
         self.lst_s_distance_columns = lst_s_distance_columns
         self.n = i_k
         self.s_class_column = s_class_column
 
-    def dist_func(self, row, value) -> float:
-        """a simple euclidean distance function
+        # store the training-data as arrays, so the batch-prediction doesn't have to
+        # look up the columns by name
+        self.np_data = df_train_data[lst_s_distance_columns].to_numpy(dtype=np.float64)
+        self.np_class_codes, self.idx_class_labels = pd.factorize(df_train_data[s_class_column])
+
+        self.metric = metric_get(metric, dct_metric_params)
+
+        self._build_index(backend)
+
+    @classmethod
+    def from_arrays(
+            cls,
+            np_data: np.ndarray,
+            np_class_codes: np.ndarray,
+            idx_class_labels: pd.Index,
+            i_k: int,
+            backend: str = "auto",
+            metric: str | DistanceMetric = "euclidean",
+            dct_metric_params: dict | None = None
+        ) -> "KNearestNeighbor":
+        """create an instance directly from the training-arrays without copying them,
+        e.g. from arrays in shared or memory-mapped memory
+
+        the instance has no dataframe, so only the array-based methods can be used
 
         Args:
-            row (_type_): _description_
-            value (_type_): _description_
+            np_data (np.ndarray): training-data with one row per training-row
+            np_class_codes (np.ndarray): class-code of every training-row
+            idx_class_labels (pd.Index): class-labels belonging to the codes
+            i_k (int): the k-nearest neighbors
+            backend (str, optional): neighbour-search, see `__init__`. Defaults to "auto".
+            metric (str | DistanceMetric, optional): see `__init__`. Defaults to "euclidean".
+            dct_metric_params (dict | None, optional): see `__init__`. Defaults to None.
 
         Returns:
-            float: distance between the two points
+            KNearestNeighbor: the new instance
+        """
+        kn = cls.__new__(cls)
+
+        kn.df_data = None
+        kn.lst_s_distance_columns = None
+        kn.n = i_k
+        kn.s_class_column = None
+
+        kn.np_data = np_data
+        kn.np_class_codes = np_class_codes
+        kn.idx_class_labels = idx_class_labels
+
+        kn.metric = metric_get(metric, dct_metric_params)
+
+        kn._build_index(backend)
+
+        return kn
+
+    def _build_index(self, backend: str):
+        """build the spatial index over the training-data once
+
+        Args:
+            backend (str): requested backend of the neighbour-search
+        """
+        self.s_backend = self.s_choose_backend(backend, *self.np_data.shape, self.metric)
+
+        if self.s_backend == "kdtree":
+            self.tree = KDTree(self.np_data, self.metric)
+        elif self.s_backend == "balltree":
+            self.tree = BallTree(self.np_data, self.metric)
+        else:
+            self.tree = None
+
+    def save(self, pth_dir: Path):
+        """store the fitted model in a directory: the arrays (training-data, classes and the
+        spatial index) as .npy-files, which `load` can memory-map, the settings as json
+
+        Args:
+            pth_dir (Path): directory to store the model in, is created if necessary
+
+        Raises:
+            ValueError: if the class-labels have mixed types, which can't be stored without pickling
         """
-        inner_value = 0
+        lst_labels = self.idx_class_labels.tolist()
+        np_labels = np.array(lst_labels)
 
-        for k in self.lst_s_distance_columns:
-            inner_value += (row[k] - value[k]) ** 2
+        # numpy converts mixed labels into a common type (e.g. 1 and "a" into strings) or into
+        # objects, the loaded model would predict other labels
+        if np_labels.dtype == object or np_labels.tolist() != lst_labels:
+            raise ValueError("the class-labels have mixed types and can't be stored")
 
-        return math.sqrt(inner_value)
+        pth_dir = Path(pth_dir)
+        pth_dir.mkdir(parents=True, exist_ok=True)
+
+        dct_np_arrays = {
+            "data": self.np_data,
+            "class_codes": self.np_class_codes,
+            "class_labels": np_labels
+        }
+
+        if self.tree is not None:
+            dct_np_arrays.update({f"tree_{kk}": vv for kk, vv in self.tree.dct_np_arrays().items()})
+
+        for kk, vv in dct_np_arrays.items():
+            np.save(pth_dir / f"{kk}.npy", np.ascontiguousarray(vv), allow_pickle=False)
+
+        with open(pth_dir / S_MODEL_FILE, "w", encoding="utf-8") as out_file:
+            json.dump({
+                "distance_columns": self.lst_s_distance_columns,
+                "k": self.n,
+                "class_column": self.s_class_column,
+                "backend": self.s_backend,
+                "metric": self.metric.s_name,
+                "metric_params": self.metric.dct_params(),
+                "arrays": list(dct_np_arrays)
+            }, out_file, indent="\t")
+
+    @classmethod
+    def load(cls, pth_dir: Path, b_mmap: bool = True) -> "KNearestNeighbor":
+        """load a model stored with `save`, without rebuilding the spatial index
+
+        the loaded instance has no dataframe, `predict` and `predict_batch` can be used
+
+        Args:
+            pth_dir (Path): directory of the stored model
+            b_mmap (bool, optional): wether to memory-map the arrays instead of reading them.
+            Defaults to True.
+
+        Returns:
+            KNearestNeighbor: the loaded model
+        """
+        pth_dir = Path(pth_dir)
+
+        with open(pth_dir / S_MODEL_FILE, encoding="utf-8") as in_file:
+            dct_model = json.load(in_file)
+
+        dct_np_arrays = {
+            kk: np.load(pth_dir / f"{kk}.npy", mmap_mode="r" if b_mmap else None, allow_pickle=False)
+            for kk in dct_model["arrays"]
+        }
+
+        kn = cls.__new__(cls)
+
+        kn.df_data = None
+        kn.lst_s_distance_columns = dct_model["distance_columns"]
+        kn.n = dct_model["k"]
+        kn.s_class_column = dct_model["class_column"]
+
+        kn.np_data = dct_np_arrays["data"]
+        kn.np_class_codes = dct_np_arrays["class_codes"]
+        kn.idx_class_labels = pd.Index(dct_np_arrays["class_labels"].tolist())
+
+        kn.metric = metric_get(dct_model["metric"], dct_model["metric_params"])
+        kn.s_backend = dct_model["backend"]
+
+        if kn.s_backend == "kdtree":
+            tree_class = KDTree
+        elif kn.s_backend == "balltree":
+            tree_class = BallTree
+        else:
+            tree_class = None
+
+        if tree_class is None:
+            kn.tree = None
+        else:
+            kn.tree = tree_class.from_arrays(kn.np_data, kn.metric, {
+                kk.removeprefix("tree_"): vv for kk, vv in dct_np_arrays.items() if kk.startswith("tree_")
+            })
+
+        return kn
+
+    @staticmethod
+    def s_choose_backend(backend: str, i_rows: int, i_dims: int, metric: DistanceMetric) -> str:
+        """resolve the backend of the neighbour-search
+
+        Args:
+            backend (str): requested backend
+            i_rows (int): number of training-rows
+            i_dims (int): number of distance-columns
+            metric (DistanceMetric): metric of the distances
+
+        Raises:
+            ValueError: if the backend is unknown or doesn't support the metric
+
+        Returns:
+            str: "brute", "kdtree" or "balltree"
+        """
+        if backend not in TPL_S_BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {TPL_S_BACKENDS}")
+
+        if (
+            backend == "kdtree" and not metric.b_kdtree
+            or backend == "balltree" and not metric.b_balltree
+        ):
+            raise ValueError(f"the backend {backend!r} doesn't support the metric {metric.s_name!r}")
+
+        if backend != "auto":
+            return backend
+
+        # trees don't pay off for small data and degrade to a linear scan in high dimensions
+        if i_rows <= I_AUTO_BRUTE_MAX_ROWS or i_dims > I_AUTO_BALLTREE_MAX_DIMS:
+            return "brute"
+        elif i_dims <= I_AUTO_KDTREE_MAX_DIMS and metric.b_kdtree:
+            return "kdtree"
+        elif metric.b_balltree:
+            return "balltree"
+        else:
+            return "brute"
 
     def predict(self, value):
         """_summary_ prediction of the class of a single row
@@ -51,7 +288,233 @@ class KNearestNeighbor:
         Returns:
             _type_: _description_
         """
-        dist = self.df_data.apply(lambda x: self.dist_func(x, value), axis=1)
-        nn = self.df_data.loc[dist.sort_values().iloc[0:self.n].index]
+        np_value = value[self.lst_s_distance_columns].to_numpy(dtype=np.float64)
+        np_neighbours = self.np_nearest_neighbours(np_value[np.newaxis], self.n)
+
+        return self.idx_class_labels[self.np_vote(np_neighbours)[0]]
+
+    def predict_batch(self, df_queries: pd.DataFrame) -> pd.Series:
+        """prediction of the classes of all rows of a dataframe at once
+
+        gives the same results as calling `predict` for every single row
+
+        Args:
+            df_queries (pd.DataFrame): rows to predict the classes for
+
+        Returns:
+            pd.Series: predicted class of every row
+        """
+        np_queries = df_queries[self.lst_s_distance_columns].to_numpy(dtype=np.float64)
+
+        # indices of the nearest training-rows, sorted by their distance
+        np_neighbours = self.np_nearest_neighbours(np_queries, self.n)
+
+        np_winners = self.np_vote(np_neighbours)
+
+        return pd.Series(
+            self.idx_class_labels.take(np_winners),
+            index=df_queries.index,
+            name=self.s_class_column
+        )
+
+    def np_distances(self, np_queries: np.ndarray) -> np.ndarray:
+        """calculate the rank-distances between the queries and all the training-rows
+
+        the rank-distances have the same order as the real distances, but skip e.g. the
+        square-root of the euclidean distance
+
+        Args:
+            np_queries (np.ndarray): queries with one row per query
+
+        Returns:
+            np.ndarray: rank-distances with one row per query and one column per training-row
+        """
+        return self.metric.np_rank_pairwise(np_queries, self.np_data)
+
+    def np_nearest_neighbours(self, np_queries: np.ndarray, i_k: int) -> np.ndarray:
+        """find the k nearest training-rows for every query
+
+        neighbours with the same distance are ordered by their position in the training-data
+
+        Args:
+            np_queries (np.ndarray): queries with one row per query
+            i_k (int): number of neighbours to find
+
+        Returns:
+            np.ndarray: indices of the neighbours with one row per query, sorted by their distance
+        """
+        i_k = min(i_k, len(self.np_data))
+
+        np_neighbours = np.empty((len(np_queries), i_k), dtype=np.intp)
+
+        # query the spatial index for every query
+        if self.tree is not None:
+            for ii, np_query in enumerate(np_queries):
+                np_neighbours[ii] = self.tree.np_query(np_query, i_k)
+
+            return np_neighbours
+
+        # process the queries in blocks to limit the size of the distance-matrix
+        i_block_size = max(1, I_BLOCK_ELEMENTS // max(1, len(self.np_data)))
+
+        for i_start in range(0, len(np_queries), i_block_size):
+            np_dist = self.np_distances(np_queries[i_start:i_start + i_block_size])
+
+            np_neighbours[i_start:i_start + i_block_size] = self._np_select_k_smallest(np_dist, i_k)
+
+        return np_neighbours
+
+    @staticmethod
+    def _np_select_k_smallest(np_dist: np.ndarray, i_k: int) -> np.ndarray:
+        """select the indices of the k smallest distances of every row, ordered by
+        (distance, index)
+
+        Args:
+            np_dist (np.ndarray): distances with one row per query
+            i_k (int): number of indices to select
+
+        Returns:
+            np.ndarray: selected indices with one row per query
+        """
+        if i_k == np_dist.shape[1]:
+            return np.argsort(np_dist, axis=1, kind="stable")
+
+        # find the k smallest distances without sorting the complete rows
+        np_part = np.argpartition(np_dist, i_k - 1, axis=1)[:, :i_k]
+        np_part_dist = np.take_along_axis(np_dist, np_part, axis=1)
+
+        # order the selected indices by their distance, equal distances by their index
+        np_order = np.lexsort((np_part, np_part_dist), axis=1)
+        np_selected = np.take_along_axis(np_part, np_order, axis=1)
+
+        # if the k-th distance appears more often than selected, the partition may have
+        # picked the wrong ones of them: sort these rows completely
+        np_kth_dist = np_part_dist.max(axis=1)
+        np_ambiguous = np.flatnonzero(
+            np.count_nonzero(np_dist <= np_kth_dist[:, np.newaxis], axis=1) > i_k
+        )
+
+        if len(np_ambiguous) > 0:
+            np_selected[np_ambiguous] = np.argsort(
+                np_dist[np_ambiguous], axis=1, kind="stable"
+            )[:, :i_k]
+
+        return np_selected
+
+    def np_vote(self, np_neighbours: np.ndarray) -> np.ndarray:
+        """majority vote of the classes of the neighbours
+
+        on a tie the class which appears first in the neighbour-list wins, i.e. the one with
+        the nearest neighbour
+
+        Args:
+            np_neighbours (np.ndarray): indices of the neighbours, sorted by their distance
+
+        Returns:
+            np.ndarray: class-code of the winner for every row
+        """
+        i_k = np_neighbours.shape[1]
+
+        # one-hot encoding of the classes with the shape (queries, neighbours, classes)
+        np_one_hot = (
+            self.np_class_codes[np_neighbours][:, :, np.newaxis]
+            == np.arange(len(self.idx_class_labels))
+        )
+
+        np_counts = np_one_hot.sum(axis=1)
+        # position of the first appearance of every class
+        np_first = np_one_hot.argmax(axis=1)
+
+        # the count decides, the first appearance breaks ties
+        return np.argmax(np_counts * (i_k + 1) - np_first, axis=1)
+
+    def np_sweep_vote(self, np_neighbours: np.ndarray, lst_i_k: list[int]) -> np.ndarray:
+        """majority votes for several k at once from a single neighbour-list
+
+        the vote for k only looks at the first k neighbours, so the counts for all k are
+        read off the prefix-sums of the one-hot encoded classes
+
+        Args:
+            np_neighbours (np.ndarray): indices of the neighbours, sorted by their distance,
+            with at least max(lst_i_k) columns or all the training-rows
+            lst_i_k (list[int]): values of k to vote for
+
+        Returns:
+            np.ndarray: class-code of the winner with one row per k and one column per query
+        """
+        i_k_max = np_neighbours.shape[1]
+
+        np_one_hot = (
+            self.np_class_codes[np_neighbours][:, :, np.newaxis]
+            == np.arange(len(self.idx_class_labels))
+        )
+
+        # number of votes of every class within the first k neighbours
+        np_prefix_counts = np.cumsum(np_one_hot, axis=1, dtype=np.intp)
+        # the first appearance of a class is the same for every k it appears in
+        np_first = np_one_hot.argmax(axis=1)
+
+        # column of the prefix-counts of every k, k larger than the training-data uses all of it
+        np_columns = np.minimum(np.asarray(lst_i_k, dtype=np.intp), i_k_max) - 1
+
+        np_scores = np_prefix_counts[:, np_columns] * (i_k_max + 1) - np_first[:, np.newaxis]
+
+        return np.argmax(np_scores, axis=2).T
+
+    def sr_sweep_errors(self, df_queries: pd.DataFrame, lst_i_k: list[int]) -> pd.Series:
+        """count the wrong predictions for several k with a single neighbour-search
+
+        the neighbours are searched and sorted once up to the largest k, the result for every k
+        is the same as of `predict_batch` with that k
+
+        Args:
+            df_queries (pd.DataFrame): rows with a known class to predict
+            lst_i_k (list[int]): values of k to evaluate
+
+        Returns:
+            pd.Series: number of wrong predictions for every k
+        """
+        np_queries = df_queries[self.lst_s_distance_columns].to_numpy(dtype=np.float64)
+        np_truth = self.idx_class_labels.get_indexer(df_queries[self.s_class_column])
+
+        lst_i_k = list(lst_i_k)
+
+        return pd.Series(
+            self.np_sweep_errors(np_queries, np_truth, lst_i_k),
+            index=pd.Index(lst_i_k, name="k"),
+            name="errors"
+        )
+
+    def np_sweep_errors(self, np_queries: np.ndarray, np_truth: np.ndarray, lst_i_k: list[int]) -> np.ndarray:
+        """array-version of `sr_sweep_errors`
+
+        Args:
+            np_queries (np.ndarray): queries with one row per query
+            np_truth (np.ndarray): correct class-code of every query
+            lst_i_k (list[int]): values of k to evaluate
+
+        Returns:
+            np.ndarray: number of wrong predictions for every k
+        """
+        lst_i_k = list(lst_i_k)
+
+        np_errors = np.zeros(len(lst_i_k), dtype=np.intp)
+
+        # process the queries in blocks to limit the size of the prefix-counts
+        i_k_max = min(max(lst_i_k), len(self.np_data))
+        i_block_size = max(
+            1, I_BLOCK_ELEMENTS // max(1, i_k_max * len(self.idx_class_labels), len(self.np_data))
+        )
+
+        for i_start in range(0, len(np_queries), i_block_size):
+            np_neighbours = self.np_nearest_neighbours(
+                np_queries[i_start:i_start + i_block_size], i_k_max
+            )
+
+            np_winners = self.np_sweep_vote(np_neighbours, lst_i_k)
+
+            np_errors += np.count_nonzero(
+                np_winners != np_truth[i_start:i_start + i_block_size], axis=1
+            )
 
-        return nn[self.s_class_column].value_counts().index[0]
+        return np_errors
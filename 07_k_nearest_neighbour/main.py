@@ -2,27 +2,74 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 import multiprocessing
+import sys
+import tempfile
 
 from matplotlib import pyplot as plt
 
 from kNearestNeighbor import KNearestNeighbor
 
+# shared modules of all the homeworks
+sys.path.append(str(Path(__file__).resolve().parent.parent / "00_common"))
+import instrumentation
+
 F_FRAC = 0.8
 
 I_SPLIT_TRAIN = int(150 * F_FRAC)
 I_SPLIT_VERIFY = 150 - I_SPLIT_TRAIN
 
+# number of worker-processes
+I_PROCESSES = 32
+
+LST_S_DISTANCE_COLUMNS = ["sepal.length","sepal.width","petal.length","petal.width"]
+S_CLASS_COLUMN = "variety"
+
+# classifier of the worker-process, created once by `init_worker`
+KN_WORKER: KNearestNeighbor = None
+# verification-data of the worker-process
+NP_WORKER_QUERIES: np.ndarray = None
+NP_WORKER_TRUTH: np.ndarray = None
+
 def main():
-    DF_DATA = pd.read_csv(Path("iris_set.csv"), quotechar='"', delimiter=',')
+    with instrumentation.stage("load") as dct_stage:
+        DF_DATA = pd.read_csv(Path("iris_set.csv"), quotechar='"', delimiter=',')
 
-    DF_DATA = DF_DATA.sample(frac=1)
+        DF_DATA = DF_DATA.sample(frac=1)
 
-    lst_i_k = range(1, I_SPLIT_TRAIN)
+        dct_stage["rows"] = len(DF_DATA)
 
-    lst_args = zip([DF_DATA] * len(lst_i_k), lst_i_k)
+    lst_i_k = range(1, I_SPLIT_TRAIN)
 
-    with multiprocessing.Pool(32) as p:
-        res = p.map(test_with_k, lst_args)
+    # encode the classes once for the training- and the verification-data
+    np_class_codes, idx_class_labels = pd.factorize(DF_DATA[S_CLASS_COLUMN])
+    np_features = DF_DATA[LST_S_DISTANCE_COLUMNS].to_numpy(dtype=np.float64)
+
+    # split the verification-rows into one slice per task, every task evaluates all k at once
+    np_bounds = np.linspace(I_SPLIT_VERIFY, len(DF_DATA), I_PROCESSES + 1).astype(int)
+
+    lst_args = [
+        (lst_i_k, i_start, i_stop)
+        for i_start, i_stop in zip(np_bounds[:-1], np_bounds[1:]) if i_start < i_stop
+    ]
+
+    # write the arrays once into memory-mapped files, the workers map them instead of
+    # receiving a pickled copy of the data with every task
+    with tempfile.TemporaryDirectory() as s_tmp_dir:
+        dct_pth_arrays = {
+            "train": pth_store_array(Path(s_tmp_dir) / "train.npy", np_features[:I_SPLIT_TRAIN]),
+            "train_classes": pth_store_array(Path(s_tmp_dir) / "train_classes.npy", np_class_codes[:I_SPLIT_TRAIN]),
+            "queries": pth_store_array(Path(s_tmp_dir) / "queries.npy", np_features),
+            "truth": pth_store_array(Path(s_tmp_dir) / "truth.npy", np_class_codes)
+        }
+
+        with instrumentation.stage("sweep", len(DF_DATA) - I_SPLIT_VERIFY), multiprocessing.Pool(
+            I_PROCESSES,
+            initializer=init_worker,
+            initargs=(dct_pth_arrays, idx_class_labels, max(lst_i_k))
+        ) as p:
+            np_errors = sum(p.map(test_k_sweep, lst_args))
+
+    res = list(zip(lst_i_k, np_errors.tolist()))
 
     for rr in res:
         print (f"{rr[0]}-nearest-neighbors: errors = {rr[1]}")
@@ -32,18 +79,59 @@ def main():
     plt.plot(*np_res)
     plt.show()
 
-def test_with_k(args) -> int:
-    kn = KNearestNeighbor(args[0][:I_SPLIT_TRAIN], ["sepal.length","sepal.width","petal.length","petal.width"], args[1], "variety")
+def pth_store_array(pth_file: Path, np_array: np.ndarray) -> Path:
+    """store an array in a .npy-file, so it can be memory-mapped
+
+    Args:
+        pth_file (Path): path of the file
+        np_array (np.ndarray): array to store
+
+    Returns:
+        Path: path of the file
+    """
+    np.save(pth_file, np.ascontiguousarray(np_array))
+
+    return pth_file
+
+def init_worker(dct_pth_arrays: dict[str, Path], idx_class_labels: pd.Index, i_k: int):
+    """map the data of the memory-mapped files and create the classifier of the worker-process
+
+    Args:
+        dct_pth_arrays (dict[str, Path]): paths of the files with the arrays
+        idx_class_labels (pd.Index): class-labels belonging to the class-codes
+        i_k (int): the largest k that will be evaluated
+    """
+    global KN_WORKER, NP_WORKER_QUERIES, NP_WORKER_TRUTH
+
+    dct_np_arrays = {kk: np.load(pp, mmap_mode="r") for kk, pp in dct_pth_arrays.items()}
+
+    KN_WORKER = KNearestNeighbor.from_arrays(
+        dct_np_arrays["train"],
+        dct_np_arrays["train_classes"],
+        idx_class_labels,
+        i_k
+    )
+
+    NP_WORKER_QUERIES = dct_np_arrays["queries"]
+    NP_WORKER_TRUTH = dct_np_arrays["truth"]
+
+def test_k_sweep(args) -> np.ndarray:
+    """count the wrong predictions of a slice of the verification-rows for every k
 
-    i_wrong_count = 0
+    Args:
+        args (tuple): values of k, start and stop of the slice
 
-    for _, ss in args[0][I_SPLIT_VERIFY:].iterrows():
-        res_predigt = kn.predict(ss)
-        
-        if res_predigt != ss["variety"]:
-            i_wrong_count += 1
+    Returns:
+        np.ndarray: number of wrong predictions for every k
+    """
+    lst_i_k, i_start, i_stop = args
 
-    return (args[1], i_wrong_count)
+    # the neighbours are searched once for the largest k, the smaller ones reuse them
+    return KN_WORKER.np_sweep_errors(
+        NP_WORKER_QUERIES[i_start:i_stop],
+        NP_WORKER_TRUTH[i_start:i_stop],
+        lst_i_k
+    )
 
 if __name__ == "__main__":
-    main()
+    instrumentation.run(main)
@@ -0,0 +1,281 @@
+"""spatial indices to find the nearest neighbours without scanning the whole training-data"""
+import abc
+import heapq
+import numpy as np
+
+from distanceMetrics import DistanceMetric
+
+# maximum number of points in a leaf of the trees
+I_LEAF_SIZE = 40
+
+class SpatialTree(abc.ABC):
+    """base-class of a binary space-partitioning tree
+
+    the nodes are stored in flat arrays: every node holds a contiguous range of `np_indices`,
+    the children of a leaf are -1
+    """
+    # the indexed points with one row per point
+    np_data: np.ndarray
+    # metric of the distances
+    metric: DistanceMetric
+    # permutation of the point-indices, so every node covers a contiguous range
+    np_indices: np.ndarray
+    # range of every node in `np_indices`
+    np_node_start: np.ndarray
+    np_node_end: np.ndarray
+    # children of every node
+    np_node_left: np.ndarray
+    np_node_right: np.ndarray
+
+    # names of the arrays which describe the tree, see `dct_np_arrays`
+    TPL_S_ARRAYS = ("np_indices", "np_node_start", "np_node_end", "np_node_left", "np_node_right")
+
+    def __init__(self, np_data: np.ndarray, metric: DistanceMetric, i_leaf_size: int = I_LEAF_SIZE):
+        """build the tree
+
+        Args:
+            np_data (np.ndarray): points to index with one row per point
+            metric (DistanceMetric): metric of the distances
+            i_leaf_size (int, optional): maximum number of points in a leaf.
+            Defaults to I_LEAF_SIZE.
+        """
+        self.np_data = np_data
+        self.metric = metric
+
+        self._build(max(1, i_leaf_size))
+        self._build_bounds()
+
+    @classmethod
+    def from_arrays(cls, np_data: np.ndarray, metric: DistanceMetric, dct_np_arrays: dict[str, np.ndarray]) -> "SpatialTree":
+        """recreate an already built tree from its arrays, e.g. loaded from a file
+
+        Args:
+            np_data (np.ndarray): the indexed points with one row per point
+            metric (DistanceMetric): metric of the distances
+            dct_np_arrays (dict[str, np.ndarray]): arrays of the tree from `dct_np_arrays`
+
+        Returns:
+            SpatialTree: the tree
+        """
+        tree = cls.__new__(cls)
+
+        tree.np_data = np_data
+        tree.metric = metric
+
+        for ss in cls.TPL_S_ARRAYS:
+            setattr(tree, ss, dct_np_arrays[ss])
+
+        return tree
+
+    def dct_np_arrays(self) -> dict[str, np.ndarray]:
+        """arrays which describe the tree, e.g. to store them in a file
+
+        Returns:
+            dict[str, np.ndarray]: the arrays by their names
+        """
+        return {ss: getattr(self, ss) for ss in self.TPL_S_ARRAYS}
+
+    def _build(self, i_leaf_size: int):
+        """split the points recursively at the median of the dimension with the largest spread
+
+        Args:
+            i_leaf_size (int): maximum number of points in a leaf
+        """
+        np_indices = np.arange(len(self.np_data))
+
+        lst_start = [0]
+        lst_end = [len(self.np_data)]
+        lst_left = [-1]
+        lst_right = [-1]
+
+        lst_stack = [0]
+
+        while lst_stack:
+            i_node = lst_stack.pop()
+            i_start, i_end = lst_start[i_node], lst_end[i_node]
+
+            # small enough for a leaf
+            if i_end - i_start <= i_leaf_size:
+                continue
+
+            np_points = self.np_data[np_indices[i_start:i_end]]
+
+            # split along the dimension with the largest spread
+            i_dim = int(np.argmax(np.ptp(np_points, axis=0)))
+            i_mid = (i_start + i_end) // 2
+
+            np_partition = np.argpartition(np_points[:, i_dim], i_mid - i_start)
+            np_indices[i_start:i_end] = np_indices[i_start:i_end][np_partition]
+
+            # add the two children
+            for i_child_start, i_child_end in ((i_start, i_mid), (i_mid, i_end)):
+                lst_start.append(i_child_start)
+                lst_end.append(i_child_end)
+                lst_left.append(-1)
+                lst_right.append(-1)
+
+                lst_stack.append(len(lst_start) - 1)
+
+            lst_left[i_node] = len(lst_start) - 2
+            lst_right[i_node] = len(lst_start) - 1
+
+        self.np_indices = np_indices
+        self.np_node_start = np.array(lst_start, dtype=np.intp)
+        self.np_node_end = np.array(lst_end, dtype=np.intp)
+        self.np_node_left = np.array(lst_left, dtype=np.intp)
+        self.np_node_right = np.array(lst_right, dtype=np.intp)
+
+    @abc.abstractmethod
+    def _build_bounds(self):
+        """calculate the bounding-volumes of the nodes"""
+
+    @abc.abstractmethod
+    def f_lower_bound(self, i_node: int, np_point: np.ndarray) -> float:
+        """lower bound of the rank-distance between a point and all the points of a node
+
+        Args:
+            i_node (int): index of the node
+            np_point (np.ndarray): point to calculate the bound for
+
+        Returns:
+            float: lower bound of the rank-distance
+        """
+
+    def np_query(self, np_point: np.ndarray, i_k: int) -> np.ndarray:
+        """find the k nearest points
+
+        points with the same distance are ordered by their index, like in the brute-force search
+
+        Args:
+            np_point (np.ndarray): point to find the neighbours for
+            i_k (int): number of neighbours
+
+        Returns:
+            np.ndarray: indices of the neighbours, sorted by their distance
+        """
+        i_k = min(i_k, len(self.np_data))
+
+        # max-heap of the best neighbours found so far, the worst neighbour is at the top
+        lst_heap: list[tuple[float, int]] = []
+
+        # depth-first search, the nearer child is visited first
+        lst_stack = [(self.f_lower_bound(0, np_point), 0)]
+
+        while lst_stack:
+            f_bound, i_node = lst_stack.pop()
+
+            # skip the node, if it can't contain a better neighbour
+            # (equal distances can still win through a smaller index)
+            if len(lst_heap) == i_k and f_bound > -lst_heap[0][0]:
+                continue
+
+            i_left = self.np_node_left[i_node]
+            i_right = self.np_node_right[i_node]
+
+            if i_left < 0:
+                self._search_leaf(i_node, np_point, i_k, lst_heap)
+            else:
+                f_bound_left = self.f_lower_bound(i_left, np_point)
+                f_bound_right = self.f_lower_bound(i_right, np_point)
+
+                if f_bound_left <= f_bound_right:
+                    lst_stack.append((f_bound_right, i_right))
+                    lst_stack.append((f_bound_left, i_left))
+                else:
+                    lst_stack.append((f_bound_left, i_left))
+                    lst_stack.append((f_bound_right, i_right))
+
+        return np.array([-ii for _, ii in sorted(lst_heap, reverse=True)], dtype=np.intp)
+
+    def _search_leaf(self, i_node: int, np_point: np.ndarray, i_k: int, lst_heap: list):
+        """add the points of a leaf to the heap of the best neighbours
+
+        Args:
+            i_node (int): index of the leaf
+            np_point (np.ndarray): point to find the neighbours for
+            i_k (int): number of neighbours
+            lst_heap (list): max-heap with (-rank-distance, -index) of the best neighbours
+        """
+        np_leaf = self.np_indices[self.np_node_start[i_node]:self.np_node_end[i_node]]
+        np_dist = self.metric.np_rank_to_point(self.np_data[np_leaf], np_point)
+
+        # only points at most as far away as the worst neighbour can improve the heap
+        if len(lst_heap) == i_k:
+            np_mask = np_dist <= -lst_heap[0][0]
+            np_leaf = np_leaf[np_mask]
+            np_dist = np_dist[np_mask]
+
+        for f_dist, i_index in zip(np_dist.tolist(), np_leaf.tolist()):
+            tpl_entry = (-f_dist, -i_index)
+
+            if len(lst_heap) < i_k:
+                heapq.heappush(lst_heap, tpl_entry)
+            elif tpl_entry > lst_heap[0]:
+                heapq.heapreplace(lst_heap, tpl_entry)
+
+class KDTree(SpatialTree):
+    """kd-tree with an axis-aligned bounding-box for every node,
+    needs a metric which can be bounded by the per-dimension gaps
+    """
+    # corners of the bounding-boxes with one row per node
+    np_node_lower: np.ndarray
+    np_node_upper: np.ndarray
+
+    TPL_S_ARRAYS = SpatialTree.TPL_S_ARRAYS + ("np_node_lower", "np_node_upper")
+
+    def _build_bounds(self):
+        self.np_node_lower = np.empty((len(self.np_node_start), self.np_data.shape[1]))
+        self.np_node_upper = np.empty_like(self.np_node_lower)
+
+        for i_node, (i_start, i_end) in enumerate(zip(self.np_node_start, self.np_node_end)):
+            np_points = self.np_data[self.np_indices[i_start:i_end]]
+
+            self.np_node_lower[i_node] = np_points.min(axis=0)
+            self.np_node_upper[i_node] = np_points.max(axis=0)
+
+    def f_lower_bound(self, i_node: int, np_point: np.ndarray) -> float:
+        # distance of the point to the box along every dimension
+        np_gap = np.maximum(
+            np.maximum(self.np_node_lower[i_node] - np_point, np_point - self.np_node_upper[i_node]),
+            0
+        )
+
+        return float(self.metric.np_rank_to_point(np_gap[np.newaxis], np.zeros_like(np_gap))[0])
+
+class BallTree(SpatialTree):
+    """ball-tree with a bounding-sphere for every node,
+    needs a metric which fulfills the triangle-inequality
+    """
+    # centers of the bounding-spheres with one row per node
+    np_node_center: np.ndarray
+    # radius of the bounding-spheres
+    np_node_radius: np.ndarray
+
+    TPL_S_ARRAYS = SpatialTree.TPL_S_ARRAYS + ("np_node_center", "np_node_radius")
+
+    # relative tolerance for rounding-errors in the triangle-inequality
+    F_BOUND_TOLERANCE = 1e-9
+
+    def _build_bounds(self):
+        self.np_node_center = np.empty((len(self.np_node_start), self.np_data.shape[1]))
+        self.np_node_radius = np.empty(len(self.np_node_start))
+
+        for i_node, (i_start, i_end) in enumerate(zip(self.np_node_start, self.np_node_end)):
+            np_points = self.np_data[self.np_indices[i_start:i_end]]
+
+            self.np_node_center[i_node] = np_points.mean(axis=0)
+            self.np_node_radius[i_node] = self.metric.np_rank_to_distance(
+                self.metric.np_rank_to_point(np_points, self.np_node_center[i_node])
+            ).max()
+
+    def f_lower_bound(self, i_node: int, np_point: np.ndarray) -> float:
+        # the triangle-inequality only holds for the real distances
+        f_dist_center = float(self.metric.np_rank_to_distance(
+            self.metric.np_rank_to_point(self.np_node_center[i_node][np.newaxis], np_point)
+        )[0])
+        f_radius = float(self.np_node_radius[i_node])
+
+        # loosen the bound slightly, so rounding can't prune a neighbour with an equal distance
+        f_bound = f_dist_center - f_radius - self.F_BOUND_TOLERANCE * (f_dist_center + f_radius)
+
+        return float(self.metric.np_distance_to_rank(np.float64(max(f_bound, 0))))
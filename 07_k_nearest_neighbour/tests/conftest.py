@@ -0,0 +1,5 @@
+"""the modules of the homework are imported by their names, like in the scripts"""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
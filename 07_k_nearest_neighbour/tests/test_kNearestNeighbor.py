@@ -0,0 +1,105 @@
+"""the batch-prediction and the spatial indices give the same results as the brute-force
+search of single rows"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kNearestNeighbor import KNearestNeighbor
+
+LST_S_COLUMNS = ["x0", "x1", "x2"]
+S_CLASS_COLUMN = "class"
+
+def df_random_data(i_rows: int, i_seed: int) -> pd.DataFrame:
+    """random rows with continuous features, so there are no ties between the distances
+
+    Args:
+        i_rows (int): number of rows
+        i_seed (int): seed of the rows
+
+    Returns:
+        pd.DataFrame: rows with the feature-columns and the class-column
+    """
+    rng = np.random.default_rng(i_seed)
+
+    df_data = pd.DataFrame(rng.normal(size=(i_rows, len(LST_S_COLUMNS))), columns=LST_S_COLUMNS)
+    df_data[S_CLASS_COLUMN] = rng.choice(["setosa", "versicolor", "virginica"], size=i_rows)
+
+    return df_data
+
+@pytest.fixture
+def tpl_df_data() -> tuple[pd.DataFrame, pd.DataFrame]:
+    return df_random_data(200, 0), df_random_data(50, 1)
+
+@pytest.mark.parametrize("s_metric", ["euclidean", "manhattan", "chebyshev"])
+def test_backends_match_brute(tpl_df_data, s_metric):
+    df_train, df_test = tpl_df_data
+
+    kn_brute = KNearestNeighbor(df_train, LST_S_COLUMNS, 5, S_CLASS_COLUMN, "brute", s_metric)
+    np_expected = kn_brute.np_nearest_neighbours(df_test[LST_S_COLUMNS].to_numpy(), 5)
+
+    for ss in ("kdtree", "balltree"):
+        kn_tree = KNearestNeighbor(df_train, LST_S_COLUMNS, 5, S_CLASS_COLUMN, ss, s_metric)
+
+        assert kn_tree.s_backend == ss
+
+        np.testing.assert_array_equal(
+            kn_tree.np_nearest_neighbours(df_test[LST_S_COLUMNS].to_numpy(), 5), np_expected
+        )
+        pd.testing.assert_series_equal(kn_tree.predict_batch(df_test), kn_brute.predict_batch(df_test))
+
+@pytest.mark.parametrize("s_backend", ["brute", "kdtree", "balltree"])
+def test_predict_batch_matches_predict(tpl_df_data, s_backend):
+    df_train, df_test = tpl_df_data
+
+    kn = KNearestNeighbor(df_train, LST_S_COLUMNS, 7, S_CLASS_COLUMN, s_backend)
+
+    sr_predicted = kn.predict_batch(df_test)
+
+    assert sr_predicted.tolist() == [kn.predict(rr) for _, rr in df_test.iterrows()]
+
+def test_sweep_errors_match_predict_batch(tpl_df_data):
+    df_train, df_test = tpl_df_data
+
+    lst_i_k = [1, 3, 5, 9]
+
+    sr_errors = KNearestNeighbor(df_train, LST_S_COLUMNS, max(lst_i_k), S_CLASS_COLUMN).sr_sweep_errors(
+        df_test, lst_i_k
+    )
+
+    for i_k in lst_i_k:
+        kn = KNearestNeighbor(df_train, LST_S_COLUMNS, i_k, S_CLASS_COLUMN)
+
+        assert sr_errors[i_k] == (kn.predict_batch(df_test) != df_test[S_CLASS_COLUMN]).sum()
+
+@pytest.mark.parametrize("s_backend", ["brute", "kdtree", "balltree"])
+@pytest.mark.parametrize("b_mmap", [True, False])
+def test_save_load_round_trip(tpl_df_data, tmp_path, s_backend, b_mmap):
+    df_train, df_test = tpl_df_data
+
+    kn_fitted = KNearestNeighbor(df_train, LST_S_COLUMNS, 5, S_CLASS_COLUMN, s_backend, "manhattan")
+    kn_fitted.save(tmp_path / "model")
+
+    kn_loaded = KNearestNeighbor.load(tmp_path / "model", b_mmap)
+
+    assert kn_loaded.s_backend == s_backend
+
+    pd.testing.assert_series_equal(kn_loaded.predict_batch(df_test), kn_fitted.predict_batch(df_test))
+
+def test_save_load_integer_labels(tpl_df_data, tmp_path):
+    df_train, df_test = tpl_df_data
+
+    df_train = df_train.assign(**{S_CLASS_COLUMN: df_train[S_CLASS_COLUMN].str.len()})
+
+    kn_fitted = KNearestNeighbor(df_train, LST_S_COLUMNS, 5, S_CLASS_COLUMN)
+    kn_fitted.save(tmp_path / "model")
+
+    assert KNearestNeighbor.load(tmp_path / "model").predict_batch(df_test).tolist() == \
+        kn_fitted.predict_batch(df_test).tolist()
+
+def test_save_mixed_labels(tpl_df_data, tmp_path):
+    df_train, _ = tpl_df_data
+
+    df_train = df_train.assign(**{S_CLASS_COLUMN: [1, "a"] * (len(df_train) // 2)})
+
+    with pytest.raises(ValueError):
+        KNearestNeighbor(df_train, LST_S_COLUMNS, 5, S_CLASS_COLUMN).save(tmp_path / "model")
@@ -1,16 +1,33 @@
 """Implementation of the bayes classificator"""
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
 class NaiveBayes:
-    """Implementation of a naive bayes classificator"""
-    # the dataset used to predict results
-    df_data: pd.DataFrame
+    """Implementation of a naive bayes classificator
+
+    the training-data is only read once by `fit`, which counts the occurences into dense
+    integer-arrays indexed by the codes of the states and values. The predictions only look up
+    these counts.
+    """
     # column-names for the result-columns
     lst_s_results: list[str]
+    # column-names for the feature-columns (all the other columns of the training-data)
+    lst_s_features: list[str]
 
     # alpha-factor for the laplace-correction
     f_laplace_alpha: float
 
+    # code of every state of the result-columns
+    dct_dct_result_codes: dict[str, dict]
+    # code of every value of the feature-columns
+    dct_dct_feature_codes: dict[str, dict]
+    # number of rows with every state of a result-column, indexed by the state-code
+    dct_np_result_counts: dict[str, np.ndarray]
+    # number of rows with every state of a result-column and value of a feature-column,
+    # indexed by [result][feature][state-code, value-code]
+    dct_dct_np_feature_counts: dict[str, dict[str, np.ndarray]]
+
     def __init__(self, df_data: pd.DataFrame, lst_s_results: list[str], f_laplace_alpha: float = 1):
         """initializing function
 
@@ -19,10 +36,271 @@ class NaiveBayes:
             lst_s_results (list[str]): column-names for the result-columns
             f_laplace_alpha (float, optional): factor for the laplace-correction. Defaults to 1.
         """
-        self.df_data = df_data
         self.lst_s_results = lst_s_results
         self.f_laplace_alpha = f_laplace_alpha
 
+        self.fit(df_data)
+
+    @classmethod
+    def from_codes(cls, np_codes: np.ndarray, encoder, lst_s_results: list[str], f_laplace_alpha: float = 1) -> "NaiveBayes":
+        """create a naive bayes from already encoded training-data, e.g. of a `DiagnosisEncoder`
+
+        Args:
+            np_codes (np.ndarray): codes with one row per row and one column per column
+            of the encoder
+            encoder (DiagnosisEncoder): encoder of the codes, with the names (`lst_s_columns`)
+            and values (`dct_tpl_codebooks`) of the columns
+            lst_s_results (list[str]): column-names for the result-columns
+            f_laplace_alpha (float, optional): factor for the laplace-correction. Defaults to 1.
+
+        Returns:
+            NaiveBayes: the fitted naive bayes
+        """
+        nb = cls.__new__(cls)
+
+        nb.lst_s_results = lst_s_results
+        nb.f_laplace_alpha = f_laplace_alpha
+
+        nb._reset([cc for cc in encoder.lst_s_columns if cc not in lst_s_results])
+        nb.partial_fit_codes(np_codes, encoder)
+
+        return nb
+
+    def fit(self, df_data: pd.DataFrame):
+        """count the occurences of the states and values of the training-data
+
+        Args:
+            df_data (pd.DataFrame): dataframe for predicting the results
+        """
+        self._reset([cc for cc in df_data.columns if cc not in self.lst_s_results])
+
+        self.partial_fit(df_data)
+
+    def _reset(self, lst_s_features: list[str]):
+        """start with empty codebooks and counts
+
+        Args:
+            lst_s_features (list[str]): column-names for the feature-columns
+        """
+        self.lst_s_features = lst_s_features
+
+        self.dct_dct_result_codes = {rr: {} for rr in self.lst_s_results}
+        self.dct_dct_feature_codes = {ff: {} for ff in self.lst_s_features}
+
+        self.dct_np_result_counts = {
+            rr: np.zeros(0, dtype=np.int64) for rr in self.lst_s_results
+        }
+        self.dct_dct_np_feature_counts = {
+            rr: {ff: np.zeros((0, 0), dtype=np.int64) for ff in self.lst_s_features}
+            for rr in self.lst_s_results
+        }
+
+    def partial_fit(self, df_rows: pd.DataFrame):
+        """add new rows to the counts, the cost only depends on the number of new rows
+
+        Args:
+            df_rows (pd.DataFrame): new rows with the result- and feature-columns
+        """
+        self._update_counts(df_rows, 1)
+
+    def forget(self, df_rows: pd.DataFrame):
+        """remove previously fitted rows from the counts
+
+        Args:
+            df_rows (pd.DataFrame): rows to remove with the result- and feature-columns
+
+        Raises:
+            ValueError: if the rows contain states or values which were never fitted or
+            more rows than were fitted
+        """
+        self._update_counts(df_rows, -1)
+
+    def partial_fit_codes(self, np_codes: np.ndarray, encoder):
+        """add new encoded rows to the counts, without encoding the values again
+
+        Args:
+            np_codes (np.ndarray): codes with one row per row and one column per column
+            of the encoder
+            encoder (DiagnosisEncoder): encoder of the codes
+        """
+        self._count_codes(self.dct_np_map_codes(np_codes, encoder, True), 1)
+
+    def dct_np_map_codes(self, np_codes: np.ndarray, encoder, b_extend: bool = False) -> dict[str, np.ndarray]:
+        """translate the codes of an encoder into the codes of the codebooks of the model
+
+        Args:
+            np_codes (np.ndarray): codes with one row per row and one column per column
+            of the encoder
+            encoder (DiagnosisEncoder): encoder of the codes
+            b_extend (bool, optional): wether values of the encoder, which are unknown to the
+            model, should be added to its codebooks. Defaults to False.
+
+        Returns:
+            dict[str, np.ndarray]: code of every row for every result- and feature-column
+            of the encoder, -1 for missing and unknown values
+        """
+        dct_np_codes = {}
+
+        for jj, cc in enumerate(encoder.lst_s_columns):
+            if cc in self.dct_dct_result_codes:
+                dct_codes = self.dct_dct_result_codes[cc]
+            elif cc in self.dct_dct_feature_codes:
+                dct_codes = self.dct_dct_feature_codes[cc]
+            else:
+                continue
+
+            # model-code of every possible uint8-code, missing values stay at -1
+            np_map = np.full(256, -1, dtype=np.intp)
+
+            for ii, vv in enumerate(encoder.dct_tpl_codebooks[cc]):
+                if b_extend and vv not in dct_codes:
+                    dct_codes[vv] = len(dct_codes)
+
+                np_map[ii] = dct_codes.get(vv, -1)
+
+            dct_np_codes[cc] = np_map[np_codes[:, jj]]
+
+        return dct_np_codes
+
+    def _update_counts(self, df_rows: pd.DataFrame, i_sign: int):
+        """add or subtract the occurences of rows to / from the counts
+
+        Args:
+            df_rows (pd.DataFrame): rows with the result- and feature-columns
+            i_sign (int): 1 to add the rows, -1 to subtract them
+
+        Raises:
+            ValueError: if rows should be subtracted which were never fitted
+        """
+        b_extend = i_sign > 0
+
+        # encode every column once, new states and values are appended to the codebooks
+        dct_np_codes = {}
+
+        for rr in self.lst_s_results:
+            dct_np_codes[rr] = np_encode_extend(df_rows[rr], self.dct_dct_result_codes[rr], b_extend)
+
+        for ff in self.lst_s_features:
+            dct_np_codes[ff] = np_encode_extend(df_rows[ff], self.dct_dct_feature_codes[ff], b_extend)
+
+        self._count_codes(dct_np_codes, i_sign)
+
+    def _count_codes(self, dct_np_codes: dict[str, np.ndarray], i_sign: int):
+        """add or subtract the occurences of encoded rows to / from the counts
+
+        Args:
+            dct_np_codes (dict[str, np.ndarray]): codes of every result- and feature-column,
+            -1 for missing values
+            i_sign (int): 1 to add the rows, -1 to subtract them
+
+        Raises:
+            ValueError: if rows should be subtracted which were never fitted
+        """
+        # count the rows first, so a failing forget doesn't leave the counts half updated
+        dct_np_result_counts = {}
+        dct_dct_np_feature_counts = {}
+
+        for rr in self.lst_s_results:
+            np_states = dct_np_codes[rr]
+            i_states = len(self.dct_dct_result_codes[rr])
+
+            # missing values have the code -1 and aren't counted
+            dct_np_result_counts[rr] = np_grow(self.dct_np_result_counts[rr], (i_states,)) \
+                + i_sign * np.bincount(np_states[np_states >= 0], minlength=i_states)
+
+            dct_dct_np_feature_counts[rr] = {}
+
+            for ff in self.lst_s_features:
+                np_values = dct_np_codes[ff]
+                i_values = len(self.dct_dct_feature_codes[ff])
+
+                np_valid = (np_states >= 0) & (np_values >= 0)
+
+                # count every combination of state and value at once
+                dct_dct_np_feature_counts[rr][ff] = np_grow(
+                    self.dct_dct_np_feature_counts[rr][ff], (i_states, i_values)
+                ) + i_sign * np.bincount(
+                    np_states[np_valid] * i_values + np_values[np_valid],
+                    minlength=i_states * i_values
+                ).reshape(i_states, i_values)
+
+        if any((np_counts < 0).any() for np_counts in dct_np_result_counts.values()) or any(
+            (np_counts < 0).any()
+            for dct_np_counts in dct_dct_np_feature_counts.values()
+            for np_counts in dct_np_counts.values()
+        ):
+            raise ValueError("can't forget rows, which were never fitted")
+
+        self.dct_np_result_counts = dct_np_result_counts
+        self.dct_dct_np_feature_counts = dct_dct_np_feature_counts
+
+    def save(self, pth_file: Path):
+        """store the fitted model (codebooks and count-tables) in an uncompressed .npz-file
+
+        Args:
+            pth_file (Path): path of the file
+
+        Raises:
+            ValueError: if a codebook has mixed types, which can't be stored without pickling
+        """
+        dct_np_arrays = {
+            "results": np.array(self.lst_s_results, dtype=str),
+            "features": np.array(self.lst_s_features, dtype=str),
+            "laplace_alpha": np.array(self.f_laplace_alpha)
+        }
+
+        for ii, rr in enumerate(self.lst_s_results):
+            dct_np_arrays[f"result_states_{ii}"] = np_codebook(self.dct_dct_result_codes[rr], rr)
+            dct_np_arrays[f"result_counts_{ii}"] = self.dct_np_result_counts[rr]
+
+            for jj, ff in enumerate(self.lst_s_features):
+                dct_np_arrays[f"feature_counts_{ii}_{jj}"] = self.dct_dct_np_feature_counts[rr][ff]
+
+        for jj, ff in enumerate(self.lst_s_features):
+            dct_np_arrays[f"feature_values_{jj}"] = np_codebook(self.dct_dct_feature_codes[ff], ff)
+
+        # open the file ourselves, so numpy doesn't append a second suffix
+        with open(pth_file, "wb") as out_file:
+            np.savez(out_file, **dct_np_arrays)
+
+    @classmethod
+    def load(cls, pth_file: Path) -> "NaiveBayes":
+        """load a model stored with `save`, without refitting it
+
+        Args:
+            pth_file (Path): path of the file
+
+        Returns:
+            NaiveBayes: the loaded model
+        """
+        with np.load(pth_file, allow_pickle=False) as npz_model:
+            nb = cls.__new__(cls)
+
+            nb.lst_s_results = npz_model["results"].tolist()
+            nb.lst_s_features = npz_model["features"].tolist()
+            nb.f_laplace_alpha = npz_model["laplace_alpha"].item()
+
+            nb.dct_dct_result_codes = {}
+            nb.dct_np_result_counts = {}
+            nb.dct_dct_np_feature_counts = {}
+
+            for ii, rr in enumerate(nb.lst_s_results):
+                nb.dct_dct_result_codes[rr] = {
+                    vv: cc for cc, vv in enumerate(npz_model[f"result_states_{ii}"].tolist())
+                }
+                nb.dct_np_result_counts[rr] = npz_model[f"result_counts_{ii}"]
+
+                nb.dct_dct_np_feature_counts[rr] = {
+                    ff: npz_model[f"feature_counts_{ii}_{jj}"] for jj, ff in enumerate(nb.lst_s_features)
+                }
+
+            nb.dct_dct_feature_codes = {
+                ff: {vv: cc for cc, vv in enumerate(npz_model[f"feature_values_{jj}"].tolist())}
+                for jj, ff in enumerate(nb.lst_s_features)
+            }
+
+        return nb
+
     def f_predict(self, str_result: str, sr_data: pd.Series, state=True) -> float:
         """predicts the propability for a result for the given input states
 
@@ -34,15 +312,32 @@ class NaiveBayes:
         Returns:
             float: propability for the result given the input states
         """
-        # calculate the prior-propabilty
-        f_prior = self.df_data[str_result].mean()
-        # calculate the prior * likelihood
-        f_res_a = f_prior * self.f_likelihood(str_result, sr_data, state)
-        # calculate the part of the evidence
-        f_res_b = (1 - f_prior) * self.f_likelihood(str_result, sr_data, not state)
+        sr_posterior = self.sr_predict_posterior(str_result, sr_data)
+
+        # a state, which never occured, has a prior-propability of 0
+        return sr_posterior.get(state, 0.0)
+
+    def sr_predict_posterior(self, str_result: str, sr_data: pd.Series) -> pd.Series:
+        """predicts the propabilities of all the states of a result for the given input states
+
+        Args:
+            str_result (str): name of the result column
+            sr_data (pd.Series): input-data
+
+        Returns:
+            pd.Series: propability of every state of the result
+        """
+        # encode the input-states, unknown values haven't occured
+        dct_np_codes = {
+            ff: np.array([self.dct_dct_feature_codes[ff].get(vv, -1)], dtype=np.intp)
+            for ff, vv in sr_data.items()
+        }
 
-        # calculate the naive-bayes
-        return 1 / (1 + f_res_b / f_res_a)
+        return pd.Series(
+            self.np_posterior(str_result, dct_np_codes, 1)[0],
+            index=list(self.dct_dct_result_codes[str_result]),
+            name=str_result
+        )
 
     def f_likelihood(self, str_result: str, sr_data: pd.Series, state=True) -> float:
         """calculate the likelihood of a result given the input states
@@ -55,8 +350,12 @@ class NaiveBayes:
         Returns:
             float: likelihood of the result given the input states
         """
-        # select only the data, where the result is of the state we are looking for
-        df_subdata = self.df_data[self.df_data[str_result] == state]
+        # look up the state, an unknown state has no rows
+        i_state = self.dct_dct_result_codes[str_result].get(state, -1)
+        i_state_rows = self.dct_np_result_counts[str_result][i_state] if i_state >= 0 else 0
+
+        dct_np_feature_counts = self.dct_dct_np_feature_counts[str_result]
+
         f_result = 1
 
         # go through the individual input-states
@@ -64,12 +363,226 @@ class NaiveBayes:
             # initialize with the laplace-alpha
             i_count = self.f_laplace_alpha
 
-            # check, wether the value even exists in the data
-            if pp[1] in df_subdata[pp[0]].values:
+            # look up the value, unknown values haven't occured
+            i_value = self.dct_dct_feature_codes[pp[0]].get(pp[1], -1)
+
+            if i_state >= 0 and i_value >= 0:
                 # add the number of occurences to the counter
-                i_count += df_subdata[pp[0]].value_counts()[pp[1]]
+                i_count += dct_np_feature_counts[pp[0]][i_state, i_value]
 
             # multiply the individual propability to the total propability
-            f_result *= i_count / (len(df_subdata) + self.f_laplace_alpha * len(sr_data))
+            f_result *= i_count / (i_state_rows + self.f_laplace_alpha * len(sr_data))
 
         return f_result
+
+    def predict_proba(self, df_data: pd.DataFrame) -> pd.DataFrame:
+        """predicts the propabilities of all the result-columns for all the rows at once
+
+        gives the same results as `f_predict` for every row and result-column, but
+        calculates them as a sum of log-propabilities, which doesn't underflow with many features
+
+        Args:
+            df_data (pd.DataFrame): input-data, result-columns are ignored
+
+        Returns:
+            pd.DataFrame: propability of the state True of every result-column for every row
+        """
+        df_res = pd.DataFrame(index=df_data.index, columns=self.lst_s_results, dtype=np.float64)
+
+        for rr, df_posterior in self.dct_predict_posterior(df_data).items():
+            # a state, which never occured, has a prior-propability of 0
+            df_res[rr] = df_posterior[True] if True in df_posterior.columns else 0.0
+
+        return df_res
+
+    def np_predict_proba_codes(self, np_codes: np.ndarray, encoder) -> np.ndarray:
+        """predicts the propabilities of all the result-columns for all the encoded rows at once,
+        like `predict_proba`
+
+        Args:
+            np_codes (np.ndarray): codes with one row per row and one column per column
+            of the encoder, result-columns are ignored
+            encoder (DiagnosisEncoder): encoder of the codes
+
+        Returns:
+            np.ndarray: propability of the state True with one row per row and one column
+            per result-column
+        """
+        dct_np_codes = {
+            cc: np_column for cc, np_column in self.dct_np_map_codes(np_codes, encoder).items()
+            if cc not in self.lst_s_results
+        }
+
+        np_res = np.zeros((len(np_codes), len(self.lst_s_results)))
+
+        for ii, rr in enumerate(self.lst_s_results):
+            # a state, which never occured, has a prior-propability of 0
+            if True in self.dct_dct_result_codes[rr]:
+                np_res[:, ii] = self.np_posterior(rr, dct_np_codes, len(np_codes))[
+                    :, self.dct_dct_result_codes[rr][True]
+                ]
+
+        return np_res
+
+    def predict(self, df_data: pd.DataFrame) -> pd.DataFrame:
+        """predicts the most propable state of every result-column for all the rows at once
+
+        Args:
+            df_data (pd.DataFrame): input-data, result-columns are ignored
+
+        Returns:
+            pd.DataFrame: most propable state of every result-column for every row
+        """
+        return pd.DataFrame({
+            rr: df_posterior.idxmax(axis="columns")
+            for rr, df_posterior in self.dct_predict_posterior(df_data).items()
+        }, index=df_data.index)
+
+    def dct_predict_posterior(self, df_data: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        """predicts the propabilities of all the states of all the result-columns for all the
+        rows in one pass, a result may have any number of states
+
+        Args:
+            df_data (pd.DataFrame): input-data, result-columns are ignored
+
+        Returns:
+            dict[str, pd.DataFrame]: propability of every state (columns) for every row,
+            for every result-column
+        """
+        lst_s_features = [cc for cc in df_data.columns if cc not in self.lst_s_results]
+
+        # encode the values of the input-data once
+        dct_np_codes = {
+            ff: np_encode(df_data[ff], self.dct_dct_feature_codes[ff]) for ff in lst_s_features
+        }
+
+        return {
+            rr: pd.DataFrame(
+                self.np_posterior(rr, dct_np_codes, len(df_data)),
+                index=df_data.index,
+                columns=list(self.dct_dct_result_codes[rr])
+            ) for rr in self.lst_s_results
+        }
+
+    def np_posterior(self, str_result: str, dct_np_codes: dict[str, np.ndarray], i_rows: int) -> np.ndarray:
+        """calculate the posterior-propabilities of all the states of a result for multiple rows
+        of encoded input-states
+
+        Args:
+            str_result (str): name of the result column
+            dct_np_codes (dict[str, np.ndarray]): value-codes of every input-column, -1 for
+            unknown values
+            i_rows (int): number of rows
+
+        Returns:
+            np.ndarray: propability with one row per row and one column per state
+        """
+        i_features = len(dct_np_codes)
+
+        np_state_counts = self.dct_np_result_counts[str_result]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # log of the prior and of the denominators of the likelihood of every state
+            np_log_state = (
+                np.log(np_state_counts / np_state_counts.sum())
+                - i_features * np.log(np_state_counts + self.f_laplace_alpha * i_features)
+            )
+
+            np_log_joint = np.tile(np_log_state, (i_rows, 1))
+
+            # add the log-propabilities of the input-states of all the states at once
+            for ff, np_codes in dct_np_codes.items():
+                # number of occurences of every value, the last column is for unknown values
+                np_counts = np_grow(
+                    self.dct_dct_np_feature_counts[str_result][ff],
+                    (len(np_state_counts), len(self.dct_dct_feature_codes[ff]) + 1)
+                )
+
+                np_log_joint += np.log(np_counts + self.f_laplace_alpha)[:, np_codes].T
+
+            # normalize with the evidence
+            return np.exp(
+                np_log_joint - np.logaddexp.reduce(np_log_joint, axis=1, keepdims=True)
+            )
+
+def np_encode(sr_data: pd.Series, dct_codes: dict) -> np.ndarray:
+    """encode the values of a column with a codebook
+
+    Args:
+        sr_data (pd.Series): values to encode
+        dct_codes (dict): code of every known value
+
+    Returns:
+        np.ndarray: code of every value, -1 for unknown values
+    """
+    np_codes = np.asarray(sr_data.map(dct_codes), dtype=np.float64)
+
+    return np.where(np.isnan(np_codes), -1, np_codes).astype(np.intp)
+
+def np_encode_extend(sr_data: pd.Series, dct_codes: dict, b_extend: bool = True) -> np.ndarray:
+    """encode the values of a column with a codebook, which is extended by unknown values
+
+    Args:
+        sr_data (pd.Series): values to encode
+        dct_codes (dict): code of every known value, is extended in place
+        b_extend (bool, optional): wether unknown values should be added to the codebook.
+        Defaults to True.
+
+    Raises:
+        ValueError: if there are unknown values and the codebook mustn't be extended
+
+    Returns:
+        np.ndarray: code of every value, -1 for missing values
+    """
+    ct_column = pd.Categorical(sr_data)
+
+    # look up the code of every category of the column only once
+    np_category_codes = np.empty(len(ct_column.categories) + 1, dtype=np.intp)
+    np_category_codes[-1] = -1
+
+    for ii, vv in enumerate(ct_column.categories):
+        if vv not in dct_codes:
+            if not b_extend:
+                raise ValueError(f"the value {vv!r} of {sr_data.name!r} was never fitted")
+
+            dct_codes[vv] = len(dct_codes)
+
+        np_category_codes[ii] = dct_codes[vv]
+
+    # missing values have the code -1, which selects the last entry
+    return np_category_codes[ct_column.codes]
+
+def np_codebook(dct_codes: dict, s_column: str) -> np.ndarray:
+    """convert a codebook into a typed array with the values in the order of their codes
+
+    Args:
+        dct_codes (dict): code of every value
+        s_column (str): name of the column, for the error-message
+
+    Raises:
+        ValueError: if the values have mixed types
+
+    Returns:
+        np.ndarray: the values
+    """
+    lst_values = list(dct_codes)
+    np_values = np.array(lst_values)
+
+    # numpy converts mixed values into a common type (e.g. True and "x" into strings) or into
+    # objects, which can't be loaded without pickling; both wouldn't encode the same values
+    if np_values.dtype == object or np_values.tolist() != lst_values:
+        raise ValueError(f"the values of {s_column!r} have mixed types and can't be stored")
+
+    return np_values
+
+def np_grow(np_counts: np.ndarray, tpl_shape: tuple[int, ...]) -> np.ndarray:
+    """pad an array of counts with zeros to a larger shape
+
+    Args:
+        np_counts (np.ndarray): counts
+        tpl_shape (tuple[int, ...]): new shape, at least as large as the current one
+
+    Returns:
+        np.ndarray: padded counts
+    """
+    return np.pad(np_counts, [(0, nn - oo) for nn, oo in zip(tpl_shape, np_counts.shape)])
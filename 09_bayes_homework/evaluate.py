@@ -0,0 +1,128 @@
+"""cross-validation of the naive bayes over the laplace-alpha and the temperature-classes
+
+run it from this directory, e.g.
+    python evaluate.py --folds 10 --alpha 0.1 0.5 1 2 --bounds 33.9,35.3,37.8,38.3,39.4,42.2 33.9,37,42.2
+"""
+import argparse
+import functools
+
+import numpy as np
+import pandas as pd
+
+from bayes import NaiveBayes
+
+# the main-module makes the shared modules of all the homeworks importable
+import main as bayes_main
+import evaluation
+from diagnosisEncoder import DiagnosisEncoder
+
+# default values of the hyperparameters
+LST_F_ALPHAS = [0.1, 0.5, 1, 2]
+LST_S_BOUNDS = [",".join(str(ff) for ff in bayes_main.TPL_F_TEMP_BOUNDS)]
+
+def main(lst_args: list[str] | None = None):
+    args = parse_args(lst_args)
+
+    df_data = bayes_main.df_load_data()
+
+    if args.repeats is None:
+        lst_tpl_folds = evaluation.lst_tpl_np_kfold(len(df_data), args.folds, args.seed)
+    else:
+        lst_tpl_folds = evaluation.lst_tpl_np_repeated_splits(
+            len(df_data), bayes_main.F_TRAINING_TEST_SPLIT, args.repeats, args.seed
+        )
+
+    # the bounds change slowest, so every task encodes and counts them as seldom as possible
+    lst_dct_params = evaluation.lst_dct_grid({
+        "bounds": [tuple(float(ff) for ff in ss.split(",")) for ss in args.bounds],
+        "alpha": args.alpha
+    })
+
+    df_scores = evaluation.df_cross_validate(
+        functools.partial(np_scores_fold, df_data),
+        lst_tpl_folds,
+        lst_dct_params,
+        args.workers,
+        args.grid_chunks
+    )
+
+    print(evaluation.df_summary(df_scores).to_string())
+
+def parse_args(lst_args: list[str] | None = None) -> argparse.Namespace:
+    """parse the command-line arguments
+
+    Args:
+        lst_args (list[str] | None, optional): arguments, None for the ones of the
+        command-line. Defaults to None.
+
+    Returns:
+        argparse.Namespace: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="cross-validate the naive bayes")
+
+    parser.add_argument("--folds", type=int, default=5, help="number of folds of the k-fold split")
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="use this many random training- and test-splits instead of k folds")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the splits")
+    parser.add_argument("--alpha", type=float, nargs="+", default=LST_F_ALPHAS,
+                        help="laplace-alphas to evaluate")
+    parser.add_argument("--bounds", nargs="+", default=LST_S_BOUNDS, metavar="T0,T1,...",
+                        help="comma-separated bounds of the temperature-classes to evaluate")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, 1 to evaluate in this process")
+    parser.add_argument("--grid-chunks", type=int, default=1,
+                        help="number of tasks the grid is split into for every fold")
+
+    return parser.parse_args(lst_args)
+
+def np_scores_fold(
+        df_data: pd.DataFrame,
+        np_train: np.ndarray,
+        np_test: np.ndarray,
+        lst_dct_params: list[dict]
+    ) -> np.ndarray:
+    """accuracy of every parameter-set on a fold
+
+    the rows are encoded and counted once for every temperature-classes, all the alphas
+    use the same count-tables, they only change the laplace-correction of the predictions
+
+    Args:
+        df_data (pd.DataFrame): complete dataset with the raw temperature
+        np_train (np.ndarray): positions of the training-rows
+        np_test (np.ndarray): positions of the test-rows
+        lst_dct_params (list[dict]): parameter-sets with "bounds" and "alpha"
+
+    Returns:
+        np.ndarray: fraction of the correctly predicted diseases of the test-rows
+        for every parameter-set
+    """
+    np_scores = np.empty(len(lst_dct_params))
+
+    # one model per temperature-classes
+    dct_models = {}
+
+    for ii, dd in enumerate(lst_dct_params):
+        if dd["bounds"] not in dct_models:
+            encoder = DiagnosisEncoder("Temperature of patient", dd["bounds"])
+            np_codes = encoder.fit_transform(df_data)
+
+            dct_models[dd["bounds"]] = (
+                encoder,
+                np_codes[np_test],
+                NaiveBayes.from_codes(np_codes[np_train], encoder, list(bayes_main.TPL_DISEASES))
+            )
+
+        encoder, np_test_codes, nb_model = dct_models[dd["bounds"]]
+
+        nb_model.f_laplace_alpha = dd["alpha"]
+
+        np_predicted = nb_model.np_predict_proba_codes(np_test_codes, encoder) >= bayes_main.F_TRESHOLD_ERROR
+        np_truth = np_test_codes[:, encoder.np_column_indices(nb_model.lst_s_results)] == \
+            np.array([encoder.dct_tpl_codebooks[rr].index(True) for rr in nb_model.lst_s_results])
+
+        np_scores[ii] = np.mean(np_predicted == np_truth)
+
+    return np_scores
+
+if __name__ == "__main__":
+    main()
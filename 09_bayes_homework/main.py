@@ -3,12 +3,20 @@ using a naive bayes classificator to predict diseases
 in the acute inflammation dataset
 """
 from pathlib import Path
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
 from bayes import NaiveBayes
 
+# shared modules of all the homeworks
+sys.path.append(str(Path(__file__).resolve().parent.parent / "00_common"))
+import instrumentation
+import datasetCache
+import evaluation
+from diagnosisEncoder import DiagnosisEncoder
+
 # path to the dataset
 PTH_DATA_FILE = Path("diagnosis.data")
 # encoding of the dataset
@@ -49,102 +57,105 @@ TPL_S_TEMP_LABELS = ("low", "normal", "mild fever", "moderate fever", "high feve
 def main():
     """main-function
     """
-    df_data = df_load_data()
+    with instrumentation.stage("load") as dct_stage:
+        df_data = df_load_data()
+
+        # encode all the columns once into small integer-codes, the temperature by its class
+        encoder = DiagnosisEncoder("Temperature of patient", TPL_F_TEMP_BOUNDS, TPL_S_TEMP_LABELS)
+        np_codes = encoder.fit_transform(df_data)
+
+        dct_stage["rows"] = len(df_data)
 
     # split the data into the training- and test-data
-    df_training, df_test = df_training_test_split(df_data, F_TRAINING_TEST_SPLIT)
+    df_training, df_test = evaluation.df_training_test_split(df_data, F_TRAINING_TEST_SPLIT)
 
     # initialize the naive bayes
-    nb_acute_inflammation = NaiveBayes(df_training, list(TPL_DISEASES), F_LAPLACE_ALPHA)
-
-    # create an empty numpy array to store the results
-    np_results = np.empty((len(df_test), 5))
+    with instrumentation.stage("fit", len(df_training)):
+        nb_acute_inflammation = NaiveBayes.from_codes(
+            np_codes[df_data.index.get_indexer(df_training.index)],
+            encoder,
+            list(TPL_DISEASES),
+            F_LAPLACE_ALPHA
+        )
 
-    # go throught the test-data and test every single dataset
-    for i_count, (i_index, sr_test) in enumerate(df_test.iterrows()):
-        np_results[i_count] = predict(sr_test, nb_acute_inflammation)
+    # predict all the test-data at once
+    with instrumentation.stage("predict", len(df_test)):
+        np_results = predict(
+            df_test,
+            np_codes[df_data.index.get_indexer(df_test.index)],
+            encoder,
+            nb_acute_inflammation
+        )
 
     # plot the results
     create_results(np_results)
 
 def df_load_data() -> pd.DataFrame:
-    """load the dataset into a dataframe and group the temperature into different baskets
+    """load the dataset into a dataframe, the temperature is grouped into the classes by the
+    `DiagnosisEncoder`; the csv-file is only parsed on the first run and after changes, later
+    runs load the binary cache
 
     Returns:
         pd.DataFrame: complete dataset
     """
     # load the dataset into a pandas dataframe
-    df_data = pd.read_csv(
-        filepath_or_buffer=PTH_DATA_FILE,
+    df_data = datasetCache.df_load_cached(
+        PTH_DATA_FILE,
         delimiter=CHR_CSV_DELIMITER,
-        names=TPL_COLUMN_NAMES,
+        names=list(TPL_COLUMN_NAMES),
         decimal=CHR_CSV_DECIMAL_POINT,
         encoding=S_CSV_ENCODING,
         true_values=["yes"],
         false_values=["no"]
     )
 
-    # map the temperature into the classes
-    df_data["Temperature of patient"] = pd.cut(
-        df_data["Temperature of patient"],
-        bins=TPL_F_TEMP_BOUNDS,
-        include_lowest=True,
-        labels=TPL_S_TEMP_LABELS
-    )
-
     return df_data
 
-def df_training_test_split(
-        df_data: pd.DataFrame,
-        f_split: float
-    ) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Split a dataframe into a training- and test-dataframe
+def predict(
+        df_test: pd.DataFrame,
+        np_test_codes: np.ndarray,
+        encoder: DiagnosisEncoder,
+        nb_acute_inflammation: NaiveBayes
+    ) -> np.ndarray:
+    """predict the diseases from the symptoms with the naive-bayes
 
     Args:
-        df_data (pd.DataFrame): complete dataframe
-        f_split (float): fraction of the training-dataframe
+        df_test (pd.DataFrame): symptoms and diseases of the test-data
+        np_test_codes (np.ndarray): codes of the test-data
+        encoder (DiagnosisEncoder): encoder of the codes
+        nb_acute_inflammation (NaiveBayes): naive-bayes instance
 
     Returns:
-        tuple[pd.DataFrame, pd.DataFrame]: training-dataframe, test-dataframe
+        np.ndarray: index, and reference and propability of every disease for every row
     """
-    # randomly select the training-data
-    df_training = df_data.sample(frac=f_split)
-    # use the remaining data as the test-data
-    df_test = df_data.drop(df_training.index)
+    # predict the propability of all the diseases for all the rows, given the symptoms
+    df_propabilities = pd.DataFrame(
+        nb_acute_inflammation.np_predict_proba_codes(np_test_codes, encoder),
+        index=df_test.index,
+        columns=list(nb_acute_inflammation.lst_s_results)
+    )
 
-    return df_training, df_test
+    # go through the rows only to print the results
+    for i_index, sr_test in df_test.iterrows():
+        # print the index (= line-number) of the data in the csv
+        print(f"\nline {i_index}")
 
-def predict(sr_test: pd.Series, nb_acute_inflammation: NaiveBayes):
-    """predict the diseases from the symptoms with the naive-bayes
+        for str_disease in TPL_DISEASES:
+            f_res = df_propabilities.at[i_index, str_disease]
 
-    Args:
-        sr_test (pd.Series): symptoms
-        nb_acute_inflammation (NaiveBayes): naive-bayes instance
-    """
-    # take only the symptoms
-    sr_symptoms = sr_test.drop(list(TPL_DISEASES))
+            print (
+                f"{str_disease}: {f_res * 100:.1f} %"
+                f"-> {f_res >= F_TRESHOLD_ERROR} ({sr_test[str_disease]})"
+            )
 
-    # print the index (= line-number) of the data in the csv
-    print(f"\nline {sr_test.name}")
+    # store the index, and the reference and the propability of every disease
+    lst_np_columns = [df_test.index.to_numpy(dtype=np.float64)]
 
-    # dictionary to store the results of the current data
-    dct_res = {}
-
-    # go through all the diseases
     for str_disease in TPL_DISEASES:
-        # predigt the propability of the current disease given the symptoms
-        f_res = nb_acute_inflammation.f_predict(str_disease, sr_symptoms)
-
-        print (
-            f"{str_disease}: {f_res * 100:.1f} %"
-            f"-> {f_res >= F_TRESHOLD_ERROR} ({sr_test[str_disease]})"
-        )
-
-        # store the results in the dictionary of the current disease
-        dct_res[str_disease] = (sr_test[str_disease], f_res)
+        lst_np_columns.append(df_test[str_disease].to_numpy(dtype=np.float64))
+        lst_np_columns.append(df_propabilities[str_disease].to_numpy())
 
-    # return the results
-    return sr_test.name, *dct_res[TPL_DISEASES[0]], *dct_res[TPL_DISEASES[1]]
+    return np.column_stack(lst_np_columns)
 
 def create_results(np_data: np.ndarray):
     """Plots the results into 4 graphs: 2 for every desease, and 2 for true / false
@@ -198,4 +209,4 @@ def create_results(np_data: np.ndarray):
     plt.show()
 
 if __name__ == "__main__":
-    main()
+    instrumentation.run(main)
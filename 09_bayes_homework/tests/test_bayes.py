@@ -0,0 +1,39 @@
+"""a stored naive bayes predicts the same as the fitted one"""
+import numpy as np
+import pandas as pd
+
+from bayes import NaiveBayes
+
+def df_random_data(i_rows: int, i_seed: int) -> pd.DataFrame:
+    """random rows with categorical features and two boolean results
+
+    Args:
+        i_rows (int): number of rows
+        i_seed (int): seed of the rows
+
+    Returns:
+        pd.DataFrame: rows with the feature- and result-columns
+    """
+    rng = np.random.default_rng(i_seed)
+
+    return pd.DataFrame({
+        "temperature": rng.choice(["low", "normal", "high"], size=i_rows),
+        "nausea": rng.choice(["yes", "no"], size=i_rows),
+        "inflammation": rng.choice([True, False], size=i_rows),
+        "nephritis": rng.choice([True, False], size=i_rows)
+    })
+
+def test_save_load_round_trip(tmp_path):
+    df_train = df_random_data(60, 0)
+    df_test = df_random_data(20, 1)
+
+    nb_fitted = NaiveBayes(df_train, ["inflammation", "nephritis"], f_laplace_alpha=0.5)
+    nb_fitted.save(tmp_path / "model.npz")
+
+    nb_loaded = NaiveBayes.load(tmp_path / "model.npz")
+
+    assert nb_loaded.lst_s_results == nb_fitted.lst_s_results
+    assert nb_loaded.f_laplace_alpha == nb_fitted.f_laplace_alpha
+
+    pd.testing.assert_frame_equal(nb_loaded.predict_proba(df_test), nb_fitted.predict_proba(df_test))
+    pd.testing.assert_frame_equal(nb_loaded.predict(df_test), nb_fitted.predict(df_test))
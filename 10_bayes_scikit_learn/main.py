@@ -1,8 +1,16 @@
 from pathlib import Path
 import copy
+import sys
 from sklearn.naive_bayes import CategoricalNB
 import pandas as pd
 
+# shared modules of all the homeworks
+sys.path.append(str(Path(__file__).resolve().parent.parent / "00_common"))
+import instrumentation
+import datasetCache
+import evaluation
+from diagnosisEncoder import DiagnosisEncoder
+
 PTH_DATA_SET = Path("diagnosis.csv")
 F_TRAINING_TEST_SPLIT = 0.85
 TPL_DISEASES = ("Inflammation of urinary bladder", "Nephritis of renal pelvis origin")
@@ -15,29 +23,37 @@ TPL_F_TEMP_BOUNDS = (33.9, 35.3, 37.8, 38.3, 39.4, 42.2)
 TPL_S_TEMP_LABELS = (0, 1, 2, 3, 4)
 
 def main():
-    df_data = pd.read_csv(PTH_DATA_SET, encoding="utf_16_le")
+    with instrumentation.stage("load") as dct_stage:
+        # parsed only on the first run and after changes, later runs load the binary cache
+        df_data = datasetCache.df_load_cached(PTH_DATA_SET, encoding="utf_16_le")
+
+        # map the temperature into the classes and all the columns into small integer-codes,
+        # which CategoricalNB takes directly
+        encoder = DiagnosisEncoder("Temperature of patient", TPL_F_TEMP_BOUNDS, TPL_S_TEMP_LABELS)
+        np_codes = encoder.fit_transform(df_data)
 
-    # map the temperature into the classes
-    df_data["Temperature of patient"] = pd.cut(
-        df_data["Temperature of patient"],
-        bins=TPL_F_TEMP_BOUNDS,
-        include_lowest=True,
-        labels=TPL_S_TEMP_LABELS
-    )
+        dct_stage["rows"] = len(df_data)
 
-    df_training, df_test = df_training_test_split(df_data, F_TRAINING_TEST_SPLIT)
+    df_training, df_test = evaluation.df_training_test_split(df_data, F_TRAINING_TEST_SPLIT)
 
-    cnb1 = CategoricalNB(alpha=F_LAPLACE_ALPHA)
+    lst_s_symptoms = [cc for cc in encoder.lst_s_columns if cc not in TPL_DISEASES]
+    np_symptom_columns = encoder.np_column_indices(lst_s_symptoms)
+
+    # every category is known, even if it doesn't occur in the training-data
+    cnb1 = CategoricalNB(alpha=F_LAPLACE_ALPHA, min_categories=encoder.np_category_counts(lst_s_symptoms))
     cnb2 = copy.deepcopy(cnb1)
 
     df_training_classes, df_training_categories = df_class_categorie_split(df_training, TPL_DISEASES)
+    np_training_codes = np_codes[df_data.index.get_indexer(df_training.index)][:, np_symptom_columns]
 
-    cnb1.fit(df_training_classes, df_training_categories[TPL_DISEASES[0]])
-    cnb2.fit(df_training_classes, df_training_categories[TPL_DISEASES[1]])
+    with instrumentation.stage("fit", len(df_training)):
+        cnb1.fit(np_training_codes, df_training_categories[TPL_DISEASES[0]])
+        cnb2.fit(np_training_codes, df_training_categories[TPL_DISEASES[1]])
 
-    df_test_classes = df_test.drop(list(TPL_DISEASES), axis=1)
-    res1 = cnb1.predict(df_test_classes)
-    res2 = cnb2.predict(df_test_classes)
+    with instrumentation.stage("predict", len(df_test)):
+        np_test_codes = np_codes[df_data.index.get_indexer(df_test.index)][:, np_symptom_columns]
+        res1 = cnb1.predict(np_test_codes)
+        res2 = cnb2.predict(np_test_codes)
 
     for rr, mm in zip(res1, df_training_categories.to_numpy()):
         print (
@@ -68,26 +84,6 @@ def main():
 
     # cnb.predict()
 
-def df_training_test_split(
-        df_data: pd.DataFrame,
-        f_split: float
-    ) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Split a dataframe into a training- and test-dataframe
-
-    Args:
-        df_data (pd.DataFrame): complete dataframe
-        f_split (float): fraction of the training-dataframe
-
-    Returns:
-        tuple[pd.DataFrame, pd.DataFrame]: training-dataframe, test-dataframe
-    """
-    # randomly select the training-data
-    df_training = df_data.sample(frac=f_split)
-    # use the remaining data as the test-data
-    df_test = df_data.drop(df_training.index)
-
-    return df_training, df_test
-
 def df_class_categorie_split(df_data: pd.DataFrame, lst_categories: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
     df_classes = df_data.drop(list(lst_categories), axis=1)
     df_categories = df_data.drop(df_classes.columns, axis=1)
@@ -95,4 +91,4 @@ def df_class_categorie_split(df_data: pd.DataFrame, lst_categories: list[str]) -
     return df_classes, df_categories
 
 if __name__ == "__main__":
-    main()
+    instrumentation.run(main)